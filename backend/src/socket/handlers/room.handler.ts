@@ -47,6 +47,11 @@ export const registerRoomHandlers = (io: Server, socket: AuthenticatedSocket) =>
              const roomName = `server_${serverId}`;
              socket.join(roomName);
 
+             // Bots receive every message of the server through the bot room (see socket.ts)
+             if (socket.userType === 'bot') {
+                 socket.join(`server_${serverId}_bots`);
+             }
+
              // Track that this user is listening to this server
              if (!userServerRooms.has(userId)) userServerRooms.set(userId, new Set());
              userServerRooms.get(userId)?.add(serverId);
@@ -95,5 +100,9 @@ export const registerRoomHandlers = (io: Server, socket: AuthenticatedSocket) =>
 
     socket.on('leave_channel', (id) => socket.leave(`channel_${id}`));
     socket.on('leave_conversation', (id) => socket.leave(`conversation_${id}`));
-    socket.on('leave_server', (id) => socket.leave(`server_${id}`));
+    socket.on('leave_server', (id) => {
+        socket.leave(`server_${id}`);
+        // Lets a bot narrow its subscriptions to specific channels of this server
+        socket.leave(`server_${id}_bots`);
+    });
 };
@@ -45,8 +45,9 @@ def on_member_join(member):
             welcome_msg = f">🎉 Bienvenue **{username}** sur le serveur !\n  Tape {CONFIG['prefix']}help pour voir toutes les commandes."
             channel = client.get_channel(channel_id)
             if channel:
-                channel.send(welcome_msg)
-                print(f"✅ Message de bienvenue envoyé")
+                # Fusionnés par salon : un raid ne déclenche pas un POST par arrivée (échecs journalisés par la file)
+                channel.send(welcome_msg, coalesce=True)
+                print(f"✅ Message de bienvenue en file")
         except Exception as e:
             print(f"❌ Erreur envoi bienvenue : {e}")
 
@@ -273,19 +274,18 @@ def on_message(message):
                 message.reply("⚠️ Limite de 50 messages maximum. Suppression de 50 messages...")
             
             print(f"🧹 Purge : {amount} messages dans {message.channel_id}")
-            messages = message.channel.history(limit=amount + 1)
-            
-            if not messages:
-                return message.reply("❌ Impossible de récupérer les messages.")
-
             count = 0
-            for msg in messages:
+            # Une seule page : supprimer le message servant de curseur casserait la pagination
+            for msg in message.channel.history_iter(limit=amount + 1, page_size=amount + 1):
                 try:
                     msg.delete()
                     count += 1
                     time.sleep(0.1)
                 except Exception as e:
                     print(f"❌ Erreur suppression {msg.id}: {e}")
+
+            if not count:
+                return message.reply("❌ Impossible de récupérer les messages.")
             
             print(f"✅ {count} messages supprimés")
             confirmation = message.channel.send(f"🧹 **{count}** messages supprimés avec succès.")
@@ -0,0 +1,136 @@
+"""
+Import-time guard for the SDK, checked against stored baselines
+
+Each scenario runs in a fresh interpreter under `python -X importtime`; its cost
+is the cumulative time of the imports it triggers (best of several runs).
+
+Two checks:
+  - heavy dependencies (machine-independent): a scenario fails if it loads a
+    module it must not need (e.g. `import velmu.embed` pulling in socketio);
+  - timings: each cost is divided by the cost of a reference import of the
+    standard library measured in the same run, and that ratio is compared with
+    the baseline. Absolute µs are never stored, so a slower or busier machine
+    does not fail by itself.
+
+The baseline is per machine and not committed: the first run records it.
+
+Usage:
+    python benchmarks/bench_import.py            # compare with baseline_import.json (recorded on first run), exit 1 on regression
+    python benchmarks/bench_import.py --update   # record the current ratios as the new baseline
+    python benchmarks/bench_import.py --show client   # importtime tree of one scenario, slowest first
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline_import.json')
+START, END = '--velmu-import-start--', '--velmu-import-end--'
+HEAVY = ('socketio', 'engineio', 'requests', 'urllib3', 'asyncio')
+# Import de référence (bibliothèque standard, indépendant du SDK) mesuré à chaque exécution
+REFERENCE = "import asyncio, json, email.message"
+
+# nom -> (instruction, dépendances lourdes interdites)
+SCENARIOS = {
+    'package': ("import velmu", HEAVY),
+    'embed': ("import velmu.embed", HEAVY),
+    'commands': ("import velmu.commands", ('socketio', 'engineio', 'requests', 'urllib3')),
+    'client': ("import velmu.client", ()),
+}
+
+
+def run_scenario(statement):
+    """(import time in µs, importtime lines, modules loaded) of `statement` in a fresh interpreter"""
+    code = (f"import sys; sys.stderr.write({START!r} + '\\n'); {statement}; "
+            f"sys.stderr.write({END!r} + ','.join(sys.modules) + '\\n')")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    lines = result.stderr.splitlines()
+    lines = lines[lines.index(START) + 1:]
+    modules = set(lines.pop()[len(END):].split(','))
+    total = 0
+    for line in lines:
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if not name.startswith('  '):  # entrées de premier niveau : leur cumul inclut les autres
+                total += int(cumulative)
+    return total, lines, modules
+
+
+def measure(statement, repeat):
+    best = None
+    for _ in range(repeat):
+        total, lines, modules = run_scenario(statement)
+        if best is None or total < best[0]:
+            best = (total, lines, modules)
+    return best
+
+
+def show(statement):
+    _, lines, _ = run_scenario(statement)
+    rows = [line.split('|') for line in lines if line.startswith('import time:') and '|' in line]
+    for _, cumulative, name in sorted(rows, key=lambda row: -int(row[1]))[:30]:
+        print(f"{int(cumulative):>8} µs  {name.rstrip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import du SDK")
+    parser.add_argument('--update', action='store_true', help="Réécrit la baseline avec les mesures actuelles")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Régression tolérée (0.25 = +25%%)")
+    parser.add_argument('--slack', type=float, default=0.05, help="Marge absolue en ratio de la référence (imports très courts)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--show', metavar='SCENARIO', choices=SCENARIOS, help="Affiche l'arbre -X importtime")
+    args = parser.parse_args()
+
+    if args.show:
+        show(SCENARIOS[args.show][0])
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    unit, _, _ = measure(REFERENCE, args.repeat)
+    print(f"📏 Référence : {REFERENCE} = {unit} µs")
+
+    results = {}
+    failures = []
+    heavy = []
+    for scenario, (statement, forbidden) in SCENARIOS.items():
+        name = f'import_{scenario}'
+        us, _, modules = measure(statement, args.repeat)
+        results[name] = ratio = round(us / unit, 4)
+        loaded = sorted(m for m in forbidden if m in modules)
+        reference = baseline.get(name)
+        regressed = reference is not None and ratio > reference * (1 + args.threshold) + args.slack
+        status = "❌" if loaded or regressed else ("✅" if reference else "🆕")
+        detail = f"(baseline {reference:.3f}, {ratio / reference - 1:+.1%})" if reference else ""
+        print(f"{status} {statement:<26} {us:>8} µs  {ratio:>7.3f} × réf.  {detail}")
+        if loaded:
+            print(f"   ↳ charge {', '.join(loaded)}")
+            heavy.append(name)
+        elif regressed:
+            failures.append(name)
+
+    if args.update or not any(name in baseline for name in results):
+        # Première exécution sur cette machine : les mesures deviennent la baseline
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"📝 Baseline mise à jour : {args.baseline}")
+        return 1 if heavy else 0
+
+    if failures or heavy:
+        print(f"\n{len(failures + heavy)} échec(s) : {', '.join(failures + heavy)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Micro-benchmarks for the SDK hot paths, checked against stored baselines
+
+Every timing is divided by the time of a calibration loop (plain dict and string
+work, no SDK code) measured in the same run, and that ratio is what the baseline
+stores and compares: a uniformly slower machine, or a busy one, shifts both.
+
+Usage:
+    python benchmarks/bench_sdk.py                  # compare with baseline_sdk.json (recorded on first run), exit 1 on regression
+    python benchmarks/bench_sdk.py --update         # record the current ratios as the new baseline
+    python benchmarks/bench_sdk.py --threshold 0.3  # tolerate up to +30% before failing
+    python benchmarks/bench_sdk.py -k embed         # only benchmarks whose name contains "embed"
+
+The baseline is still per machine (interpreter, CPU) and is not committed: the
+first run records it, --update refreshes it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from velmu.commands import CommandManager
+from velmu.embed import Embed
+from velmu.models import Message, Reaction
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_sdk.json')
+
+USER = {
+    'id': '7c6b6f0e-2b7a-4d8e-9a51-0f3c3b1e8d21',
+    'username': 'alice',
+    'discriminator': '0420',
+    'avatarUrl': 'https://cdn.velmu.app/avatars/alice.png',
+    'isBot': False,
+}
+
+MESSAGE_PAYLOAD = {
+    'id': '0b8f6d2c-5e51-4a8b-9d1a-0e5f2f6b7c11',
+    'content': "salut tout le monde, quelqu'un a vu le match hier soir ?",
+    'channelId': 'b514708d-792c-44c0-b65a-ae5eebc47d02',
+    'serverId': 'c2a7f1d4-8e3b-4c6a-9f2e-1d5b7a9c3e40',
+    'userId': USER['id'],
+    'user': USER,
+    'createdAt': '2025-12-03T18:42:11.512Z',
+    'replyToId': '5d3e9b71-0c2f-4f8a-b6d4-7a1e3c9f2b58',
+    'replyTo': {
+        'id': '5d3e9b71-0c2f-4f8a-b6d4-7a1e3c9f2b58',
+        'content': 'le match commence à 21h',
+        'channelId': 'b514708d-792c-44c0-b65a-ae5eebc47d02',
+        'user': dict(USER, id='1f0e2d3c-4b5a-6978-8a9b-0c1d2e3f4a5b', username='bob'),
+    },
+    'attachments': [],
+    'reactions': [],
+    'embed': None,
+}
+
+REACTION_FLAT = {'messageId': MESSAGE_PAYLOAD['id'], 'userId': USER['id'], 'emoji': '🪨'}
+REACTION_NESTED = {'messageId': MESSAGE_PAYLOAD['id'], 'reaction': {
+    'id': '9e8d7c6b-5a49-3827-1605-f4e3d2c1b0a9', 'messageId': MESSAGE_PAYLOAD['id'],
+    'userId': USER['id'], 'emoji': '✂️', 'createdAt': '2025-12-03T18:42:12.001Z'}}
+
+CHATTER = [
+    "salut tout le monde, quelqu'un a vu le match hier soir ?",
+    "franchement c'était incroyable, le but à la 89e minute",
+    "je suis pas d'accord, l'arbitre a été nul tout le match",
+    "bon je vais manger, à plus",
+]
+
+
+def small_embed():
+    return Embed().set_title("🏓 Pong").set_description("Latence : 42ms").set_color(0x3498DB)
+
+
+def maximal_embed():
+    embed = Embed()
+    embed.set_author("A" * 300, url="https://velmu.app", icon_url="https://velmu.app/icon.png")
+    embed.set_title("T" * 300, url="https://velmu.app/title")
+    embed.set_description("D" * 5000)
+    embed.set_color("#FFDD57")
+    embed.set_thumbnail("https://velmu.app/thumb.png")
+    embed.set_image("https://velmu.app/image.png")
+    for i in range(25):
+        embed.add_field(f"Champ {i}" * 10, "V" * 1100, inline=i % 2 == 0)
+    embed.set_footer("F" * 2100, icon_url="https://velmu.app/footer.png")
+    embed.set_timestamp()
+    return embed
+
+
+def make_manager():
+    client = SimpleNamespace(user=SimpleNamespace(id='bot-id'))
+    manager = CommandManager(client, '!')
+    sys.stdout, stdout = open(os.devnull, 'w'), sys.stdout
+    try:
+        for name in ('ping', 'help', 'joke', 'roll', 'flip', 'stats'):
+            manager.command(name=name, category='Bench')(lambda message, args: None)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return manager
+
+
+def handle_messages(manager, loop, messages):
+    async def run():
+        for message in messages:
+            await manager.handle_message(message)
+    return lambda: loop.run_until_complete(run())
+
+
+def has_bad_word(content, bad_words):
+    """The auto-moderation check of main.py / advanced_bot.py"""
+    for bad_word in bad_words:
+        if bad_word in content.lower():
+            return True
+    return False
+
+
+def calibration():
+    """Reference workload: the kind of dict/str work the SDK does, without the SDK"""
+    data = {}
+    for i in range(50):
+        key = f"field_{i}"
+        data[key] = {'id': key, 'value': str(i) * 3, 'inline': i % 2 == 0}
+    return [item['value'].upper() for item in data.values() if item['inline']]
+
+
+def build_benchmarks():
+    """name -> (callable, operations performed per call)"""
+    loop = asyncio.new_event_loop()
+    manager = make_manager()
+    command_messages = [Message(dict(MESSAGE_PAYLOAD, content=f"!{name} 6"), None)
+                        for name in ('ping', 'roll', 'unknown', 'flip')] * 25
+    chatter_messages = [Message(dict(MESSAGE_PAYLOAD, content=text), None) for text in CHATTER] * 25
+
+    small, maximal = small_embed(), maximal_embed()
+    words = ["idiot", "nul", "spam", "stupide"]
+    texts = CHATTER * 25
+
+    return {
+        'message_construct': (lambda: Message(MESSAGE_PAYLOAD, None), 1),
+        'embed_to_dict_small': (small.to_dict, 1),
+        'embed_to_dict_maximal': (maximal.to_dict, 1),
+        'commands_command_traffic': (handle_messages(manager, loop, command_messages), len(command_messages)),
+        'commands_chatter_traffic': (handle_messages(manager, loop, chatter_messages), len(chatter_messages)),
+        'automod_match': (lambda: [has_bad_word(text, words) for text in texts], len(texts)),
+        'reaction_parse_flat': (lambda: Reaction(REACTION_FLAT, None), 1),
+        'reaction_parse_nested': (lambda: Reaction(REACTION_NESTED, None), 1),
+    }
+
+
+def measure(func, ops, repeat=7):
+    """Best per-operation time in nanoseconds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number / ops * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques du SDK")
+    parser.add_argument('--update', action='store_true', help="Réécrit la baseline avec les mesures actuelles")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Régression tolérée (0.25 = +25%%)")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('-k', dest='filter', default=None, help="Ne lance que les benchmarks contenant ce texte")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    unit = measure(calibration, 1)
+    print(f"📏 Calibration : {unit:.0f} ns")
+
+    results = {}
+    regressions = []
+    for name, (func, ops) in build_benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        ns = measure(func, ops)
+        results[name] = ratio = ns / unit
+        reference = baseline.get(name)
+        if reference:
+            change = ratio / reference - 1
+            status = "❌" if change > args.threshold else "✅"
+            if change > args.threshold:
+                regressions.append(name)
+            print(f"{status} {name:<28} {ns:>10.0f} ns/op  {ratio:>8.4f} × calib.  (baseline {reference:.4f}, {change:+.1%})")
+        else:
+            print(f"🆕 {name:<28} {ns:>10.0f} ns/op  {ratio:>8.4f} × calib.")
+
+    if args.update or not any(name in baseline for name in results):
+        # Première exécution sur cette machine : les mesures deviennent la baseline
+        baseline.update({name: round(ratio, 5) for name, ratio in results.items()})
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"📝 Baseline mise à jour : {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold:.0%} : {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
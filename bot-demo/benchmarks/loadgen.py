@@ -0,0 +1,229 @@
+"""
+End-to-end load generator: simulated users against a running bot, on a local fake server
+
+Starts a FakeVelmuServer, launches the bot under test against it, then has N users
+spread over M channels send a mix of commands, chatter and reactions at a target
+rate. Reports throughput and message-sent -> reply-received latency percentiles.
+
+Usage:
+    python benchmarks/loadgen.py --bot "python main.py" --users 50 --channels 10 --rate 20 --duration 30
+    python benchmarks/loadgen.py --bot "python pfc_bot.py" --commands "!pfc" --mix 0.5,0.3,0.2
+    python benchmarks/loadgen.py --no-spawn --port 4000   # start the bot yourself (VELMU_URL=...)
+
+The bot script's BOT_TOKEN is accepted by the fake server (or pass --token), and
+VELMU_URL points the bot's Client at it.
+"""
+
+import argparse
+import math
+import os
+import random
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+BOT_DEMO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BOT_DEMO_DIR)
+
+from velmu.fake_server import FakeVelmuServer
+
+CHATTER = [
+    "salut tout le monde",
+    "quelqu'un joue ce soir ?",
+    "mdr trop bien",
+    "je reviens dans 5 min",
+    "vous avez vu la dernière mise à jour ?",
+    "gg à tous",
+]
+EMOJIS = ['👍', '😂', '🔥', '🪨', '📄', '✂️']
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    # Rang = plus petit k tel que k >= p% de n (round() arrondit au pair : p99 de 100 valeurs donnait le max)
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LoadGenerator:
+    def __init__(self, server: FakeVelmuServer, bot_user: dict, users: int, channels: int, servers: int,
+                 commands: List[str], mix: List[float]):
+        self.server = server
+        self.bot_user = bot_user
+        self.commands = commands
+        self.mix = mix
+
+        self.users = [server.add_user(f"user{i}")[0] for i in range(users)]
+        self.channels = []
+        for s in range(servers):
+            guild = server.add_server(f"Serveur {s}", owner_id=self.users[0]['id'],
+                                      members=[u['id'] for u in self.users] + [bot_user['id']])
+            for c in range(max(1, channels // servers)):
+                self.channels.append(server.add_channel(guild['id'], f"salon-{s}-{c}"))
+
+        self.sent = Counter()
+        self.latencies: List[float] = []
+        self.unmatched_replies = 0
+        self._pending: Dict[str, float] = {}
+        self._pending_by_channel: Dict[str, List[str]] = {}
+        self._recent: List[str] = []
+        self._lock = threading.Lock()
+        server.message_listeners.append(self._on_message)
+
+    def _on_message(self, message: dict):
+        if message['userId'] != self.bot_user['id']:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            source = message.get('replyToId')
+            if source not in self._pending:
+                # Réponse sans replyToId (channel.send) : on l'attribue à la plus ancienne commande du salon
+                queue = self._pending_by_channel.get(message['channelId']) or []
+                source = next((m for m in queue if m in self._pending), None)
+            if source is None:
+                self.unmatched_replies += 1
+                return
+            self.latencies.append(now - self._pending.pop(source))
+            queue = self._pending_by_channel.get(message['channelId'])
+            if queue and source in queue:
+                queue.remove(source)
+
+    def step(self):
+        user = random.choice(self.users)
+        channel = random.choice(self.channels)
+        kind = random.choices(['command', 'chatter', 'reaction'], weights=self.mix)[0]
+
+        if kind == 'reaction' and self._recent:
+            self.server.react(user['id'], random.choice(self._recent), random.choice(EMOJIS))
+        elif kind == 'command':
+            with self._lock:
+                message = self.server.post_message(user['id'], channel['id'], random.choice(self.commands))
+                self._pending[message['id']] = time.perf_counter()
+                self._pending_by_channel.setdefault(channel['id'], []).append(message['id'])
+            self._remember(message['id'])
+        else:
+            kind = 'chatter'
+            message = self.server.post_message(user['id'], channel['id'], random.choice(CHATTER))
+            self._remember(message['id'])
+        self.sent[kind] += 1
+
+    def _remember(self, message_id: str):
+        self._recent.append(message_id)
+        if len(self._recent) > 200:
+            del self._recent[:100]
+
+    def run(self, rate: float, duration: float):
+        # Boucle ouverte : on garde le rythme cible même si le bot prend du retard
+        interval = 1.0 / rate
+        start = time.perf_counter()
+        n = 0
+        while True:
+            target = start + n * interval
+            if target - start >= duration:
+                break
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.step()
+            n += 1
+        return time.perf_counter() - start
+
+
+def wait_for_bot(server: FakeVelmuServer, bot_id: str, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if bot_id in server._sessions.values():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def token_from_script(command: str) -> Optional[str]:
+    for part in shlex.split(command):
+        path = os.path.join(BOT_DEMO_DIR, part) if not os.path.isabs(part) else part
+        if part.endswith('.py') and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                match = re.search(r'^BOT_TOKEN\s*=\s*["\']([^"\']+)["\']', f.read(), re.M)
+            if match:
+                return match.group(1)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générateur de charge de bout en bout pour un bot Velmu")
+    parser.add_argument('--bot', default='python main.py', help="Commande qui lance le bot (dans bot-demo/)")
+    parser.add_argument('--no-spawn', action='store_true', help="Ne lance pas le bot, attend qu'il se connecte")
+    parser.add_argument('--token', default=None, help="Token du bot (défaut : BOT_TOKEN du script)")
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--channels', type=int, default=5)
+    parser.add_argument('--servers', type=int, default=1)
+    parser.add_argument('--rate', type=float, default=10.0, help="Messages/réactions par seconde (total)")
+    parser.add_argument('--duration', type=float, default=20.0, help="Durée de l'envoi (s)")
+    parser.add_argument('--drain', type=float, default=5.0, help="Attente des dernières réponses (s)")
+    parser.add_argument('--commands', default='!ping,!roll,!flip,!8ball ça marche ?')
+    parser.add_argument('--mix', default='0.4,0.5,0.1', help="Proportions commandes,discussion,réactions")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence REST simulée (s)")
+    args = parser.parse_args()
+
+    token = args.token or token_from_script(args.bot) or 'loadgen-bot-token'
+    server = FakeVelmuServer(port=args.port, latency=args.latency)
+    bot_user, _ = server.add_user('BotSousTest', bot=True, token=token)
+    generator = LoadGenerator(server, bot_user, args.users, args.channels, args.servers,
+                              [c.strip() for c in args.commands.split(',') if c.strip()],
+                              [float(x) for x in args.mix.split(',')])
+    server.start()
+    print(f"🧪 Serveur factice : {server.url} ({len(generator.channels)} salons, {args.users} utilisateurs)")
+
+    process = None
+    if not args.no_spawn:
+        env = dict(os.environ, VELMU_URL=server.url, PYTHONUNBUFFERED='1')
+        process = subprocess.Popen(shlex.split(args.bot), cwd=BOT_DEMO_DIR, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        print(f"   Lance le bot avec VELMU_URL={server.url} (token : {token[:12]}…)")
+
+    try:
+        if not wait_for_bot(server, bot_user['id'], timeout=60 if args.no_spawn else 20):
+            print("❌ Le bot ne s'est pas connecté au serveur factice.")
+            return 1
+        time.sleep(0.5)
+
+        print(f"🚀 Envoi : {args.rate}/s pendant {args.duration}s")
+        elapsed = generator.run(args.rate, args.duration)
+        time.sleep(args.drain)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        server.stop()
+
+    latencies_ms = [l * 1000 for l in generator.latencies]
+    commands_sent = generator.sent['command']
+    routes = Counter(route for route, _, _ in server.request_log)
+    errors = sum(1 for _, status, _ in server.request_log if status >= 400)
+
+    print("\n📊 Résultats")
+    print(f"   Envoyés        : {sum(generator.sent.values())} ({dict(generator.sent)}) en {elapsed:.1f}s")
+    print(f"   Réponses       : {len(latencies_ms)}/{commands_sent} commandes"
+          f" ({commands_sent - len(latencies_ms)} sans réponse, {generator.unmatched_replies} non attribuées)")
+    print(f"   Débit          : {len(latencies_ms) / (elapsed + args.drain):.1f} réponses/s")
+    if latencies_ms:
+        print(f"   Latence (ms)   : p50={percentile(latencies_ms, 50):.1f}  p95={percentile(latencies_ms, 95):.1f}"
+              f"  p99={percentile(latencies_ms, 99):.1f}  max={max(latencies_ms):.1f}")
+    print(f"   Requêtes REST  : {len(server.request_log)} ({errors} erreurs)")
+    for route, count in routes.most_common(5):
+        print(f"      {count:>6}  {route}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+REST fan-out and time per command, from spans written by velmu.FileSpanExporter
+
+Usage:
+    python benchmarks/trace_report.py spans.jsonl
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from velmu.tracing import fanout_report, read_spans
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage : python benchmarks/trace_report.py spans.jsonl")
+        return 1
+    report = fanout_report(read_spans(argv[0]))
+    print(f"{'commande / événement':<28} {'traces':>7} {'REST/trace':>11} {'REST ms':>9} {'total ms':>9}")
+    for key, entry in sorted(report.items(), key=lambda item: -item[1]['requests']):
+        traces = entry['traces'] or 1
+        print(f"{key:<28} {entry['traces']:>7} {entry['requests'] / traces:>11.1f}"
+              f" {entry['request_time'] * 1000 / traces:>9.1f} {entry['event_time'] * 1000 / traces:>9.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
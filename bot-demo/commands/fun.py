@@ -1,51 +1,38 @@
 import velmu
-import requests
 import random
 
 def setup(manager):
 
-    @manager.command(name="joke", description="Blague aléatoire", category="🎨 Fun")
+    jokes = [
+        "Pourquoi les plongeurs plongent-ils toujours en arrière ? Parce que sinon ils tombent dans le bateau ! 🤿",
+        "Qu'est-ce qu'un crocodile qui surveille une station ? Un Lacoste ! 🐊",
+        "Qu'est-ce qu'un dinosaure qui dort ? Un dinodor ! 🦕"
+    ]
+
+    def send_joke(message, joke_text):
+        embed = velmu.Embed()
+        embed.set_title("😄 Blague")
+        embed.set_description(joke_text)
+        embed.set_color(0xF1C40F)
+        manager.client.http.send_message(message.channel_id, embed=embed)
+
+    def joke_fallback(message, args):
+        # Servi immédiatement tant que jokeapi est hors service (circuit ouvert)
+        send_joke(message, random.choice(jokes))
+
+    @manager.command(name="joke", description="Blague aléatoire", category="🎨 Fun", fallback=joke_fallback)
     def joke_command(message, args):
-        try:
-            response = requests.get("https://v2.jokeapi.dev/joke/Any?lang=fr&type=single", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                
-                joke_text = ""
-                if 'joke' in data:
-                    joke_text = data['joke']
-                else:
-                    # Fallback
-                    jokes = [
-                        "Pourquoi les plongeurs plongent-ils toujours en arrière ? Parce que sinon ils tombent dans le bateau ! 🤿",
-                        "Qu'est-ce qu'un crocodile qui surveille une station ? Un Lacoste ! 🐊",
-                        "Qu'est-ce qu'un dinosaure qui dort ? Un dinodor ! 🦕"
-                    ]
-                    joke_text = random.choice(jokes)
-                    
-                embed = velmu.Embed()
-                embed.set_title("😄 Blague")
-                embed.set_description(joke_text)
-                embed.set_color(0xF1C40F)
-                manager.client.http.send_message(message.channel_id, embed=embed)
-            else:
-                message.reply("❌ Impossible de récupérer une blague.")
-        except:
-            # Fallback local en cas d'erreur
-            jokes = [
-                "Pourquoi les plongeurs plongent-ils toujours en arrière ? Parce que sinon ils tombent dans le bateau ! 🤿",
-                "Qu'est-ce qu'un crocodile qui surveille une station ? Un Lacoste ! 🐊"
-            ]
-            embed = velmu.Embed()
-            embed.set_title("😄 Blague")
-            embed.set_description(random.choice(jokes))
-            embed.set_color(0xF1C40F)
-            manager.client.http.send_message(message.channel_id, embed=embed)
+        response = manager.client.http.get_external("https://v2.jokeapi.dev/joke/Any?lang=fr&type=single", timeout=5)
+        if response.status_code != 200:
+            raise Exception(f"jokeapi a répondu {response.status_code}")
+
+        data = response.json()
+        send_joke(message, data['joke'] if 'joke' in data else random.choice(jokes))
 
     @manager.command(name="catfact", description="Fait sur les chats", category="🎨 Fun")
     def catfact_command(message, args):
         try:
-            response = requests.get("https://catfact.ninja/fact", timeout=5)
+            response = manager.client.http.get_external("https://catfact.ninja/fact", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 embed = velmu.Embed()
@@ -61,7 +48,7 @@ def setup(manager):
     @manager.command(name="dogfact", description="Fait sur les chiens", category="🎨 Fun")
     def dogfact_command(message, args):
         try:
-            response = requests.get("https://dog-api.kinduff.com/api/facts", timeout=5)
+            response = manager.client.http.get_external("https://dog-api.kinduff.com/api/facts", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 embed = velmu.Embed()
@@ -77,7 +64,7 @@ def setup(manager):
     @manager.command(name="advice", description="Conseil du jour", category="🎨 Fun")
     def advice_command(message, args):
         try:
-            response = requests.get("https://api.adviceslip.com/advice", timeout=5)
+            response = manager.client.http.get_external("https://api.adviceslip.com/advice", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 embed = velmu.Embed()
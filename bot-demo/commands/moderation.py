@@ -14,19 +14,18 @@ def setup(manager):
                 message.reply("⚠️ Limite de 50 messages maximum. Suppression de 50 messages...")
             
             print(f"🧹 Purge : {amount} messages dans {message.channel_id}")
-            messages = manager.client.http.get_channel_messages(message.channel_id, limit=amount + 1)
-            
-            if not messages or not isinstance(messages, list):
-                return message.reply("❌ Impossible de récupérer les messages.")
-
             count = 0
-            for msg_data in messages:
+            # Une seule page : supprimer le message servant de curseur casserait la pagination
+            for msg in message.channel.history_iter(limit=amount + 1, page_size=amount + 1):
                 try:
-                    manager.client.http.delete_message(msg_data['id'])
+                    msg.delete()
                     count += 1
                     time.sleep(0.1)
                 except Exception as e:
-                    print(f"❌ Erreur suppression {msg_data['id']}: {e}")
+                    print(f"❌ Erreur suppression {msg.id}: {e}")
+
+            if not count:
+                return message.reply("❌ Impossible de récupérer les messages.")
             
             confirmation = manager.client.http.send_message(message.channel_id, f"🧹 **{count}** messages supprimés avec succès.")
             
@@ -2,10 +2,10 @@ import velmu
 import os
 import google.generativeai as genai
 import random
-import sqlite3
 import asyncio
 import json
 import time
+from gemini_memory import MemoryStore, ConsolidationQueue
 
 # --- CONFIGURATION INITIALE ---
 # Configuration
@@ -17,14 +17,15 @@ BOT_TOKEN = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJ1c2VySWQiOiJhNGU5ODkzOS1hMj
 
 # --- LISTE DES SERVEURS AUTORISÉS ---
 # Mets les IDs des serveurs où tu veux que le bot parle ici.
-# Note: Velmu n'a pas forcément de "selfbot" mode, mais on peut filtrer par server_id
+# Le bot ne s'abonne qu'à ces serveurs / salons (voir client.subscribe) : le reste n'est jamais reçu
 ALLOWED_GUILD_IDS = [
-    # 1038108273703919746,  # Exemple
+    # "c2a7f1d4-8e3b-4c6a-9f2e-1d5b7a9c3e40",  # Exemple
 ]
 
 # --- LISTE DES SALONS AUTORISÉS ---
+# Si renseignée, elle prime : seuls ces salons sont écoutés
 ALLOWED_CHANNEL_IDS = [
-    # 1360543297294041340,  # Exemple
+    # "b514708d-792c-44c0-b65a-ae5eebc47d02",  # Exemple
 ]
 
 # --- TAUX DE RÉPONSE ALÉATOIRE ---
@@ -80,56 +81,20 @@ else:
 
 # --- CONFIGURATION VELMU ---
 client = velmu.Client()
+if ALLOWED_CHANNEL_IDS:
+    client.subscribe(channels=ALLOWED_CHANNEL_IDS)
+elif ALLOWED_GUILD_IDS:
+    client.subscribe(servers=ALLOWED_GUILD_IDS)
 
 # --- GESTION DE LA MÉMOIRE ---
-conversation_history = {}
+conversation_history = velmu.HistoryStore(max_lines=40, max_channels=500)
 DB_FILE = "nexus_memory.db"
+memory_store = MemoryStore(DB_FILE)
 
-def setup_database():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_facts (
-            user_id INTEGER PRIMARY KEY,
-            username TEXT NOT NULL,
-            facts TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-def get_user_facts(user_id):
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT facts FROM user_facts WHERE user_id = ?", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
-    except Exception as e:
-        print(f"Erreur DB get_user_facts: {e}")
-        return None
-
-def update_user_facts(user_id, username, updated_facts):
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO user_facts (user_id, username, facts)
-            VALUES (?, ?, ?)
-        ''', (user_id, username, updated_facts))
-        conn.commit()
-        conn.close()
-        print(f"[Mémoire CONSOLIDÉE] Faits mis à jour pour {username}: \n{updated_facts}")
-    except Exception as e:
-        print(f"Erreur DB update_user_facts: {e}")
-
-async def process_memory_background(message, conversation_history_snippet):
+async def consolidate_memory(user_id, username, conversation_history_snippet):
     if not memory_model: return
     try:
-        user_id = message.author.id
-        username = message.author.username
-        existing_facts = get_user_facts(user_id) or "Aucun fait connu pour le moment."
+        existing_facts = await memory_store.get_facts(user_id) or "Aucun fait connu pour le moment."
 
         consolidation_prompt = f"""
         Mission : Mettre à jour la mémoire sur l'utilisateur '{username}'.
@@ -139,7 +104,7 @@ async def process_memory_background(message, conversation_history_snippet):
         {existing_facts}
         ---
 
-        NOUVEL EXTRAIT DE CONVERSATION (incluant le dernier message de {username}) :
+        NOUVEL EXTRAIT DE CONVERSATION (incluant les derniers messages de {username}) :
         ---
         {conversation_history_snippet}
         ---
@@ -157,13 +122,17 @@ async def process_memory_background(message, conversation_history_snippet):
         updated_facts = response.text.strip()
 
         if updated_facts != "AUCUNE_MODIFICATION" and updated_facts:
-            update_user_facts(user_id, username, updated_facts)
+            memory_store.set_facts(user_id, username, updated_facts)
+            print(f"[Mémoire CONSOLIDÉE] Faits mis à jour pour {username}: \n{updated_facts}")
         else:
             print(f"[Mémoire] Aucune modification factuelle pour {username}.")
 
     except Exception as e:
         print(f"Erreur lors du traitement de la mémoire en arrière-plan : {e}")
 
+# Un seul appel de consolidation par utilisateur après 30s de calme, 6 appels/minute max
+memory_queue = ConsolidationQueue(consolidate_memory, quiet_period=30.0, calls_per_minute=6)
+
 # --- ÉVÉNEMENTS ---
 @client.event
 def on_ready():
@@ -189,7 +158,7 @@ def on_ready():
     
     print(f'Taux de réponse aléatoire : {RANDOM_RESPONSE_RATE * 100}%')
     
-    setup_database()
+    memory_store.start()
     print(f"Base de données '{DB_FILE}' prête.")
     print('Imrane est maintenant en ligne et à l\'écoute.')
     print('------------------------------------------------------')
@@ -203,68 +172,77 @@ async def on_message(message):
     # Ignore les messages des autres bots (si on peut le détecter, Velmu User n'a pas is_bot exposé facilement ici sauf si on l'a ajouté)
     if getattr(message.author, 'is_bot', False):
         return
-    
-    # Vérification du serveur autorisé (si configuré)
-    if ALLOWED_GUILD_IDS and message.server_id and int(message.server_id) not in ALLOWED_GUILD_IDS:
-        return
-    
-    # Vérification du salon autorisé (si configuré)
-    if ALLOWED_CHANNEL_IDS and message.channel_id and int(message.channel_id) not in ALLOWED_CHANNEL_IDS:
-        return
+
+    # Serveurs / salons autorisés : filtrés en amont par les abonnements du client
 
     # --- Gestion de l'historique ---
     channel_id = str(message.channel_id)
-    if channel_id not in conversation_history:
-        conversation_history[channel_id] = []
-    
-    conversation_history[channel_id].append(f"{message.author.username}: {message.content}")
-    if len(conversation_history[channel_id]) > 40:
-        conversation_history[channel_id] = conversation_history[channel_id][-40:]
+    conversation_history.append(channel_id, f"{message.author.username}: {message.content}")
 
     # --- Déclenchement de la réponse ---
-    # Détection de mention (simple string check pour Velmu)
-    is_mentioned = str(client.user.id) in message.content or f"<@{client.user.id}>" in message.content
-    
-    should_respond = is_mentioned or random.random() < RANDOM_RESPONSE_RATE
+    should_respond = is_mentioned(message) or random.random() < RANDOM_RESPONSE_RATE
 
     if should_respond and model:
-        try:
-            # --- Préparation du prompt ---
-            user_facts = get_user_facts(message.author.id)
-            memory_prompt_part = ""
-            if user_facts:
-                memory_prompt_part = f"--- Quelques souvenirs que tu as sur {message.author.username} ---\n{user_facts}\n------------------------------------------------\n"
-
-            general_history_part = "\n".join(conversation_history[channel_id][-10:]) 
-
-            # Note: Velmu n'a pas message.reference facilement accessible ici sans fetch
-            reply_context_part = ""
-
-            full_prompt = (f"{memory_prompt_part}"
-                           f"Ambiance du canal (messages récents) :\n{general_history_part}\n\n"
-                           f"{reply_context_part}"
-                           f"--- MESSAGE À RÉPONDRE ---\n"
-                           f"'{message.author.username}' a dit : '{message.content}'\n"
-                           f"--------------------------------------\n\n"
-                           f"Ta mission : Tu es Imrane. Réponds directement à '{message.author.username}' en respectant scrupuleusement ta personnalité et tes règles d'interaction (surtout la RÈGLE D'OR: NE RIEN INVENTER).")
-
-            # --- APPEL API : GÉNÉRATION DE LA RÉPONSE ---
-            chat_session = model.start_chat()
-            response = await chat_session.send_message_async(full_prompt)
-            nexus_response = response.text
-            
-            # 1. On répond
-            message.reply(nexus_response)
+        # Une seule génération à la fois par salon : les messages qui arrivent
+        # pendant qu'on répond sont regroupés dans la génération suivante
+        generation_scheduler.submit(channel_id, message)
 
-            # 2. On met à jour l'historique local
-            conversation_history[channel_id].append(f"Imrane: {nexus_response}")
-            
-            # 3. On lance la gestion de la mémoire en TÂCHE DE FOND
-            # Velmu on_message est déjà async wrapper si on utilise async def
-            await process_memory_background(message, general_history_part)
+def is_mentioned(message):
+    # Détection de mention (simple string check pour Velmu)
+    return str(client.user.id) in message.content or f"<@{client.user.id}>" in message.content
+
+async def generate_reply(ctx):
+    channel_id = ctx.channel_id
+    message = ctx.latest
+    try:
+        # --- Préparation du prompt ---
+        # Servi depuis le cache mémoire : pas d'accès disque dans le cas courant
+        user_facts = await memory_store.get_facts(message.author.id)
+        memory_prompt_part = ""
+        if user_facts:
+            memory_prompt_part = f"--- Quelques souvenirs que tu as sur {message.author.username} ---\n{user_facts}\n------------------------------------------------\n"
+
+        general_history_part = "\n".join(conversation_history.recent(channel_id, 10))
+
+        # Note: Velmu n'a pas message.reference facilement accessible ici sans fetch
+        reply_context_part = ""
+
+        # Messages arrivés pendant la génération précédente : on y répond en une fois
+        to_answer = "\n".join(f"'{m.author.username}' a dit : '{m.content}'" for m in ctx.requests)
+
+        full_prompt = (f"{memory_prompt_part}"
+                       f"Ambiance du canal (messages récents) :\n{general_history_part}\n\n"
+                       f"{reply_context_part}"
+                       f"--- MESSAGE À RÉPONDRE ---\n"
+                       f"{to_answer}\n"
+                       f"--------------------------------------\n\n"
+                       f"Ta mission : Tu es Imrane. Réponds directement à '{message.author.username}' en respectant scrupuleusement ta personnalité et tes règles d'interaction (surtout la RÈGLE D'OR: NE RIEN INVENTER).")
+
+        # --- APPEL API : GÉNÉRATION DE LA RÉPONSE ---
+        chat_session = model.start_chat()
+        response = await chat_session.send_message_async(full_prompt, stream=True)
 
-        except Exception as e:
-            print(f"Erreur lors de la génération de la réponse : {e}")
+        # Des messages plus récents sont déjà en file : la prochaine génération les couvre.
+        # On ne jette la réponse que si personne ne nous a mentionné dans ce lot.
+        if ctx.superseded and not any(is_mentioned(m) for m in ctx.requests):
+            return
+
+        # 1. On répond en streaming : le message apparaît dès les premiers mots
+        nexus_response = await message.stream_reply(response, min_interval=1.0)
+
+        # 2. On met à jour l'historique local
+        conversation_history.append(channel_id, f"Imrane: {nexus_response}")
+
+        # 3. On confie la gestion de la mémoire à la file de fond (debounce par utilisateur)
+        for m in ctx.requests:
+            memory_queue.submit(m.author.id, m.author.username,
+                                f"{general_history_part}\nImrane: {nexus_response}")
+
+    except Exception as e:
+        print(f"Erreur lors de la génération de la réponse : {e}")
+
+# Au plus 2 appels Gemini simultanés, tous salons confondus
+generation_scheduler = velmu.GenerationScheduler(generate_reply, max_concurrent=2, max_age=60.0)
 
 @client.event
 async def on_reaction_add(reaction):
@@ -288,5 +266,15 @@ async def on_reaction_add(reaction):
         if message and message.author and message.author.id == client.user.id:
             message.delete()
 
+def shutdown():
+    """Arrêt propre (seul ou sous BotRunner) : les consolidations en attente écrivent encore en base."""
+    client.run_coroutine(memory_queue.stop())
+    memory_store.close()
+
 if __name__ == '__main__':
-    client.run(BOT_TOKEN)
+    if os.getenv("VELMU_PROFILE_PORT"):
+        client.serve_profiler(int(os.getenv("VELMU_PROFILE_PORT")))
+    try:
+        client.run(BOT_TOKEN)
+    finally:
+        shutdown()
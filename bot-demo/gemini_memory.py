@@ -0,0 +1,320 @@
+"""
+Mémoire persistante du bot Gemini (faits retenus sur chaque utilisateur)
+"""
+
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+_SELECT_FACTS = "SELECT facts FROM user_facts WHERE user_id = ?"
+_SELECT_ALL = "SELECT user_id, facts FROM user_facts"
+_UPSERT_FACTS = "INSERT OR REPLACE INTO user_facts (user_id, username, facts) VALUES (?, ?, ?)"
+
+
+class MemoryStore:
+    """
+    Store SQLite des faits utilisateurs, pensé pour ne jamais bloquer la boucle asyncio.
+
+    - Une seule connexion longue durée (mode WAL), détenue par un thread dédié.
+      Les requêtes utilisent toujours le même texte SQL, donc sqlite3 réutilise
+      ses statements préparés au lieu de les recompiler à chaque appel.
+    - Cache mémoire en lecture : un fait déjà lu (ou écrit) ne retouche pas le disque.
+    - Écritures regroupées : plusieurs mises à jour d'un même utilisateur pendant
+      `flush_interval` ne produisent qu'une seule écriture, en une transaction.
+    """
+    def __init__(self, db_file: str, flush_interval: float = 2.0, preload: bool = True):
+        self.db_file = db_file
+        self.flush_interval = flush_interval
+        self.preload = preload
+
+        self._cache: Dict[str, Optional[str]] = {}
+        # Si tout le contenu de la table est en cache, un absent est un vrai absent
+        self._fully_cached = False
+        self._pending: Dict[str, Tuple[str, str]] = {}
+        self._pending_lock = threading.Lock()
+
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    # --- Cycle de vie ---
+    def start(self):
+        """Ouvre la base dans le thread de stockage (idempotent)."""
+        if self._thread:
+            return
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="memory-store", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            # Base illisible, disque plein... : on remonte l'erreur au lieu de bloquer pour toujours
+            self._thread.join()
+            self._thread = None
+            raise self._error
+
+    def close(self):
+        """Écrit les modifications en attente puis ferme la connexion."""
+        if not self._thread:
+            return
+        self._tasks.put(None)
+        self._thread.join()
+        self._thread = None
+
+    # --- Lecture ---
+    def get_cached(self, user_id) -> Tuple[bool, Optional[str]]:
+        """Retourne (trouvé, faits) sans jamais toucher au disque."""
+        key = str(user_id)
+        if key in self._cache:
+            return True, self._cache[key]
+        if self._fully_cached:
+            return True, None
+        return False, None
+
+    async def get_facts(self, user_id) -> Optional[str]:
+        """Faits connus sur un utilisateur ; ne lit la base qu'en cas d'absence du cache."""
+        found, facts = self.get_cached(user_id)
+        if found:
+            return facts
+        return await asyncio.wrap_future(self._submit(self._load_facts, str(user_id)))
+
+    def get_facts_sync(self, user_id) -> Optional[str]:
+        found, facts = self.get_cached(user_id)
+        if found:
+            return facts
+        return self._submit(self._load_facts, str(user_id)).result()
+
+    # --- Écriture ---
+    def set_facts(self, user_id, username: str, facts: str):
+        """Met à jour le cache immédiatement ; l'écriture disque est différée et regroupée."""
+        key = str(user_id)
+        self._cache[key] = facts
+        with self._pending_lock:
+            self._pending[key] = (username, facts)
+
+    def flush(self):
+        """Force l'écriture des modifications en attente (bloquant)."""
+        self._submit(self._flush_pending).result()
+
+    # --- Thread de stockage ---
+    def _submit(self, func, *args) -> Future:
+        if not self._thread:
+            self.start()
+        future: Future = Future()
+        self._tasks.put((future, func, args))
+        return future
+
+    def _run(self):
+        try:
+            self._conn = sqlite3.connect(self.db_file, cached_statements=64)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema()
+            if self.preload:
+                for user_id, facts in self._conn.execute(_SELECT_ALL):
+                    self._cache.setdefault(str(user_id), facts)
+                self._fully_cached = True
+        except BaseException as e:
+            self._error = e
+            if getattr(self, '_conn', None) is not None:
+                self._conn.close()
+            return
+        finally:
+            self._ready.set()
+
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                task = self._tasks.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                task = ()
+
+            if task is None:
+                break
+            if task:
+                future, func, args = task
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(func(*args))
+                    except Exception as e:
+                        future.set_exception(e)
+
+            if time.monotonic() >= next_flush:
+                self._flush_pending()
+                next_flush = time.monotonic() + self.flush_interval
+
+        self._flush_pending()
+        self._conn.close()
+
+    def _create_schema(self):
+        columns = {row[1]: row[2] for row in self._conn.execute("PRAGMA table_info(user_facts)")}
+        with self._conn:
+            if columns.get('user_id') == 'INTEGER':
+                # Les IDs Velmu sont des UUID : l'ancien schéma (INTEGER PRIMARY KEY) refusait toute écriture
+                self._conn.execute("ALTER TABLE user_facts RENAME TO user_facts_old")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS user_facts (
+                    user_id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    facts TEXT
+                )
+            ''')
+            if columns.get('user_id') == 'INTEGER':
+                self._conn.execute("INSERT INTO user_facts SELECT CAST(user_id AS TEXT), username, facts FROM user_facts_old")
+                self._conn.execute("DROP TABLE user_facts_old")
+
+    def _load_facts(self, key: str) -> Optional[str]:
+        row = self._conn.execute(_SELECT_FACTS, (key,)).fetchone()
+        facts = row[0] if row else None
+        self._cache.setdefault(key, facts)
+        return self._cache[key]
+
+    def _flush_pending(self):
+        with self._pending_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    _UPSERT_FACTS,
+                    [(user_id, username, facts) for user_id, (username, facts) in batch.items()]
+                )
+        except Exception as e:
+            print(f"Erreur DB écriture mémoire : {e}")
+            # On remet les écritures perdues en attente, sans écraser les plus récentes
+            with self._pending_lock:
+                for user_id, entry in batch.items():
+                    self._pending.setdefault(user_id, entry)
+
+
+class ConsolidationQueue:
+    """
+    File de consolidation de mémoire en arrière-plan, avec debounce par utilisateur.
+
+    Chaque échange soumis est fusionné avec les précédents du même utilisateur ;
+    l'appel LLM n'est lancé qu'après `quiet_period` secondes sans nouveau message
+    de sa part, et jamais plus de `calls_per_minute` fois par minute au total.
+    Au-delà du budget, les consolidations attendent (et continuent d'accumuler),
+    dans des bornes fixes : `max_lines` dernières lignes par utilisateur et
+    `max_pending` utilisateurs en attente (le plus ancien est abandonné au-delà).
+    stop() consolide tout ce qui attend encore, budget compris.
+    """
+    def __init__(self, consolidate: Callable[[str, str, str], Awaitable[None]],
+                 quiet_period: float = 30.0, calls_per_minute: int = 6, max_lines: int = 60,
+                 max_pending: int = 500):
+        self.consolidate = consolidate
+        self.quiet_period = quiet_period
+        self.calls_per_minute = calls_per_minute
+        self.max_lines = max_lines
+        self.max_pending = max_pending
+
+        self._pending: Dict[str, dict] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._calls: Deque[float] = deque()
+
+    def submit(self, user_id, username: str, exchange: str):
+        """Planifie la consolidation d'un échange. À appeler depuis la boucle asyncio ; ne bloque pas."""
+        if self._worker is None:
+            self._loop = asyncio.get_running_loop()
+            self._ready = asyncio.Queue()
+            self._worker = self._loop.create_task(self._run())
+
+        key = str(user_id)
+        entry = self._pending.get(key)
+        if entry is None:
+            if len(self._pending) >= self.max_pending:
+                # Budget dépassé depuis longtemps : on abandonne l'utilisateur en attente le plus ancien
+                oldest = next(iter(self._pending))
+                dropped = self._pending.pop(oldest)
+                if dropped['timer']:
+                    dropped['timer'].cancel()
+                print(f"⚠️ Consolidation abandonnée pour {dropped['username']} (file pleine)")
+            entry = self._pending[key] = {'username': username, 'lines': [], 'seen': {}, 'timer': None}
+
+        # Les extraits successifs se recouvrent (historique glissant) : on ne garde chaque ligne qu'une fois
+        for line in exchange.splitlines():
+            if line and line not in entry['seen']:
+                entry['seen'][line] = None
+                entry['lines'].append(line)
+        if len(entry['lines']) > self.max_lines:
+            del entry['lines'][:-self.max_lines]
+        # Lignes déjà vues : bornées elles aussi (les plus anciennes sortent de l'historique glissant)
+        while len(entry['seen']) > 2 * self.max_lines:
+            del entry['seen'][next(iter(entry['seen']))]
+
+        if entry['timer']:
+            entry['timer'].cancel()
+        entry['timer'] = self._loop.call_later(self.quiet_period, self._ready.put_nowait, key)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def stop(self, timeout: float = 30.0):
+        """
+        Arrête le worker et consolide immédiatement tout ce qui attend (timers ou
+        budget) : rien n'est perdu à l'arrêt, dans la limite de `timeout` secondes.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        pending, self._pending = self._pending, {}
+        for entry in pending.values():
+            if entry['timer']:
+                entry['timer'].cancel()
+
+        async def drain():
+            for key, entry in pending.items():
+                try:
+                    await self.consolidate(key, entry['username'], "\n".join(entry['lines']))
+                except Exception as e:
+                    print(f"Erreur lors de la consolidation de la mémoire : {e}")
+
+        try:
+            await asyncio.wait_for(drain(), timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ Consolidations restantes abandonnées à l'arrêt (délai dépassé)")
+
+    async def _run(self):
+        while True:
+            key = await self._ready.get()
+            await self._acquire_budget()
+
+            # Retiré seulement maintenant : ce qui est arrivé pendant l'attente est inclus
+            entry = self._pending.get(key)
+            if entry is None or (entry['timer'] and entry['timer'].when() > self._loop.time()):
+                # Déjà traité, ou l'utilisateur a reparlé entre-temps : le prochain timer s'en chargera
+                continue
+            del self._pending[key]
+
+            self._calls.append(time.monotonic())
+            try:
+                await self.consolidate(key, entry['username'], "\n".join(entry['lines']))
+            except asyncio.CancelledError:
+                # Interrompu par stop() : stop() la refera
+                self._pending.setdefault(key, entry)
+                raise
+            except Exception as e:
+                print(f"Erreur lors de la consolidation de la mémoire : {e}")
+
+    async def _acquire_budget(self):
+        while True:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= 60:
+                self._calls.popleft()
+            if len(self._calls) < self.calls_per_minute:
+                return
+            await asyncio.sleep(60 - (now - self._calls[0]))
@@ -1,7 +1,6 @@
 import velmu
 import time
 import os
-import importlib
 from velmu.commands import CommandManager
 
 # Configuration
@@ -11,7 +10,11 @@ CONFIG = {
     "prefix": "!",
     "welcome_channel_id": "b514708d-792c-44c0-b65a-ae5eebc47d02",
     "bad_words": ["idiot", "nul", "spam", "stupide"],
-    "auto_mod_enabled": True
+    "auto_mod_enabled": True,
+    # IDs autorisés à utiliser les commandes d'administration (!profile), séparés par des virgules
+    "owner_ids": [i for i in os.getenv("VELMU_OWNER_IDS", "").split(",") if i],
+    # Recharge les fichiers de commands/ dès qu'ils sont modifiés (sans reconnexion)
+    "hot_reload": os.getenv("VELMU_HOT_RELOAD") == "1"
 }
 
 client = velmu.Client()
@@ -24,14 +27,18 @@ manager = CommandManager(client, CONFIG["prefix"])
 def load_commands():
     """Charge dynamiquement les modules de commandes"""
     commands_dir = os.path.join(os.path.dirname(__file__), 'commands')
+    manifest = os.path.join(commands_dir, 'manifest.json')
+    if os.path.exists(manifest):
+        # Modules importés à la première utilisation (python -m velmu.manifest commands pour le régénérer)
+        manager.load_manifest(manifest)
+        print(f"📦 Manifeste chargé : {len(manager.commands)} commandes, {len(manager.modules)} module(s) importé(s)")
+        return
     for filename in os.listdir(commands_dir):
         if filename.endswith('.py') and not filename.startswith('__'):
             module_name = f"commands.{filename[:-3]}"
             try:
-                module = importlib.import_module(module_name)
-                if hasattr(module, 'setup'):
-                    module.setup(manager)
-                    print(f"📦 Module chargé : {filename}")
+                manager.load(module_name)
+                print(f"📦 Module chargé : {filename}")
             except Exception as e:
                 print(f"❌ Erreur chargement {filename}: {e}")
 
@@ -87,7 +94,8 @@ def on_member_join(member):
     if channel_id and channel_id != "REMPLACER_PAR_ID_DU_CHANNEL":
         try:
             welcome_msg = f">🎉 Bienvenue **{username}** sur le serveur !\n  Tape {CONFIG['prefix']}help pour voir toutes les commandes."
-            client.http.send_message(channel_id, welcome_msg)
+            # Fusionnés par salon : un raid ne déclenche pas un POST par arrivée (échecs journalisés par la file)
+            client.http.send_message(channel_id, welcome_msg, coalesce=True)
         except Exception as e:
             print(f"❌ Erreur envoi bienvenue : {e}")
 
@@ -95,10 +103,19 @@ def on_member_join(member):
 # DÉMARRAGE
 # ============================
 
-if __name__ == '__main__':
+def setup():
+    """Prépare le bot avant connexion (aussi appelé par run_bots.py)."""
     client.start_time = time.time()
     print("="*50)
     print("🤖 Démarrage du bot Velmu Modular v3.0")
     print("="*50)
     load_commands()
+    manager.enable_admin_commands(CONFIG["owner_ids"])
+    if CONFIG["hot_reload"]:
+        manager.watch()
+
+if __name__ == '__main__':
+    setup()
+    if os.getenv("VELMU_PROFILE_PORT"):
+        client.serve_profiler(int(os.getenv("VELMU_PROFILE_PORT")))
     client.run(BOT_TOKEN)
@@ -1,6 +1,6 @@
 import velmu
+import os
 import random
-import time
 import re
 
 # Configuration
@@ -8,6 +8,24 @@ BOT_TOKEN = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJ1c2VySWQiOiJhNGU5ODkzOS1hMj
 
 client = velmu.Client()
 
+# Les défis sans réponse expirent au bout de GAME_TTL secondes (voir expire_game)
+GAME_TTL = 300
+
+MOVES = {
+    '🪨': 'Pierre',
+    '📄': 'Feuille',
+    '✂️': 'Ciseau'
+}
+
+def expire_game(message_id, game):
+    """Défi non terminé à temps : on l'indique sur le message d'origine."""
+    # PUT /messages/:id ne modifie que le texte : l'embed du défi reste, le texte l'annote
+    client.unwatch_reactions(message_id)
+    try:
+        client.http.edit_message(message_id, f"⌛ Le défi de {game['p1_name']} a expiré. Relance une partie avec !pfc")
+    except Exception as e:
+        print(f"Impossible de marquer le défi {message_id} comme expiré : {e}")
+
 # Stockage des parties en cours
 # {
 #   message_id: {
@@ -20,13 +38,7 @@ client = velmu.Client()
 #       'channel_id': channel_id
 #   }
 # }
-active_games = {}
-
-MOVES = {
-    '🪨': 'Pierre',
-    '📄': 'Feuille',
-    '✂️': 'Ciseau'
-}
+active_games = velmu.SessionStore(ttl=GAME_TTL, on_expire=expire_game)
 
 def get_winner(move1, move2):
     if move1 == move2:
@@ -101,23 +113,23 @@ def on_message(message):
                 'channel_id': message.channel_id
             }
             
-            # Ajout des réactions
+            # Seules les réactions de coup des joueurs de cette partie parviendront à on_reaction_add
+            players = [message.author.id] if mode == 'pve' else [message.author.id, target_id]
+            client.watch_reactions(msg_id, emojis=MOVES.keys(), users=players, ttl=GAME_TTL)
+
+            # Ajout des réactions (en arrière-plan, dans l'ordre ; les échecs sont journalisés par add_reactions)
             temp_msg = velmu.Message(msg_data, client.http)
-            temp_msg.add_reaction('🪨')
-            time.sleep(0.2)
-            temp_msg.add_reaction('📄')
-            time.sleep(0.2)
-            temp_msg.add_reaction('✂️')
+            temp_msg.add_reactions(MOVES.keys())
 
 @client.event
 def on_reaction_add(reaction):
     if reaction.user_id == client.user.id:
         return
 
-    if reaction.message_id not in active_games:
+    game = active_games.get(reaction.message_id)
+    if game is None:
         return
 
-    game = active_games[reaction.message_id]
     user_id = reaction.user_id
     
     # Vérifier si le joueur fait partie de la partie
@@ -172,7 +184,8 @@ def on_reaction_add(reaction):
         if msg:
             msg.reply(embed=embed)
             
-        del active_games[reaction.message_id]
+        active_games.pop(reaction.message_id)
+        client.unwatch_reactions(reaction.message_id)
 
     # Logique PvP
     elif game['mode'] == 'pvp':
@@ -206,7 +219,8 @@ def on_reaction_add(reaction):
             if msg:
                 msg.reply(embed=embed)
                 
-            del active_games[reaction.message_id]
+            active_games.pop(reaction.message_id)
+            client.unwatch_reactions(reaction.message_id)
         else:
             # Un seul joueur a joué
             # On peut envoyer un message de confirmation discret si on veut, mais reaction.delete() suffit souvent
@@ -218,4 +232,7 @@ def on_reply(message):
         message.add_reaction('👀')
 
 if __name__ == '__main__':
+    # Profilage à la demande : curl '127.0.0.1:9101/profile?mode=cpu&seconds=30'
+    if os.getenv("VELMU_PROFILE_PORT"):
+        client.serve_profiler(int(os.getenv("VELMU_PROFILE_PORT")))
     client.run(BOT_TOKEN)
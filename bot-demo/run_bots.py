@@ -0,0 +1,42 @@
+"""
+Lance main.py, pfc_bot.py et gemini_bot.py dans un seul processus (voir velmu.BotRunner)
+
+Usage:
+    python run_bots.py                 # les trois bots
+    python run_bots.py main pfc_bot    # seulement certains
+    python run_bots.py --shards 4 main # un bot, un gateway + 4 processus (voir velmu.ShardedRunner)
+"""
+
+import importlib
+import sys
+
+import velmu
+
+# Hooks de démarrage / d'arrêt de chaque bot ("module:attribut", importables par les workers)
+BOTS = {
+    'main': dict(setup='main:setup'),
+    'pfc_bot': dict(),
+    'gemini_bot': dict(shutdown='gemini_bot:shutdown'),
+}
+
+
+def main(names):
+    runner = velmu.BotRunner()
+    for name in names:
+        module = importlib.import_module(name)
+        hooks = {hook: velmu.sharding.resolve(target) for hook, target in BOTS[name].items()}
+        runner.add(module.client, module.BOT_TOKEN, **hooks)
+    runner.run()
+
+
+def main_sharded(name, workers):
+    module = importlib.import_module(name)
+    velmu.ShardedRunner(f'{name}:client', module.BOT_TOKEN, workers=workers, **BOTS[name]).run()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--shards']:
+        main_sharded(args[2] if len(args) > 2 else 'main', int(args[1]))
+    else:
+        main(args or list(BOTS))
@@ -0,0 +1,42 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from velmu.fake_server import FakeVelmuServer  # noqa: E402
+
+
+class World:
+    """A started FakeVelmuServer with one bot, one user and one channel"""
+
+    def __init__(self, server):
+        self.server = server
+        self.bot, self.token = server.add_user('testbot', bot=True)
+        self.alice, _ = server.add_user('alice')
+        self.guild = server.add_server('Test', owner_id=self.alice['id'], members=[self.bot['id']])
+        self.channel = server.add_channel(self.guild['id'], 'general')
+
+    def connect(self, client, timeout: float = 10.0):
+        """Run `client` in a background thread until on_ready has fired"""
+        thread = threading.Thread(target=client.run, args=(self.token,), kwargs={'reconnect': False}, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + timeout
+        while client.user is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert client.user is not None, "le client ne s'est pas connecté au serveur factice"
+        return thread
+
+
+@pytest.fixture
+def world():
+    server = FakeVelmuServer()
+    world = World(server)
+    server.start()
+    try:
+        yield world
+    finally:
+        server.stop()
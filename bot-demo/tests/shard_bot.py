@@ -0,0 +1,13 @@
+"""Bot imported by the sharding workers of test_sharding.py"""
+import os
+
+import velmu
+
+client = velmu.Client()
+client.subscribe(channels=[os.environ['VELMU_TEST_CHANNEL']])
+
+
+@client.event
+def on_message(message):
+    if message.author.id != client.user.id:
+        message.channel.send(f"vu : {message.content}")
@@ -0,0 +1,62 @@
+import velmu
+from velmu.http import HTTPClient
+
+
+def make_client(world):
+    client = velmu.Client(base_url=world.server.url)
+    client.http = HTTPClient(world.token, api_url=f"{world.server.url}/api")
+    received = []
+
+    @client.event
+    def on_message(message):
+        if message.backfilled:
+            received.append(message.content)
+
+    return client, received
+
+
+def post(world, content):
+    return world.server.post_message(world.alice['id'], world.channel['id'], content)
+
+
+def test_backfill_stops_at_the_last_seen_message(world):
+    client, received = make_client(world)
+    for i in range(5):
+        post(world, f"ancien {i}")
+    client._accept_message(post(world, "dernier vu"))
+    for i in range(3):
+        post(world, f"manqué {i}")
+
+    client._backfill(page_size=2)
+
+    assert received == ["manqué 0", "manqué 1", "manqué 2"]
+
+
+def test_backfill_stops_at_the_date_of_a_deleted_last_seen_message(world):
+    client, received = make_client(world)
+    for i in range(5):
+        post(world, f"ancien {i}")
+    last = post(world, "dernier vu")
+    client._accept_message(last)
+    for i in range(3):
+        post(world, f"manqué {i}")
+    world.server.messages.pop(last['id'])
+    world.server.channel_messages[world.channel['id']].remove(last['id'])
+
+    client._backfill(page_size=2)
+
+    assert received == ["manqué 0", "manqué 1", "manqué 2"]
+
+
+def test_history_still_returns_a_list(world):
+    client, _ = make_client(world)
+    for i in range(3):
+        post(world, f"message {i}")
+    channel = velmu.Channel({'id': world.channel['id'], 'name': 'general'}, client.http)
+
+    history = channel.history(limit=2)
+
+    assert isinstance(history, list)
+    assert [m.content for m in history] == ["message 2", "message 1"]
+    assert [m.content for m in channel.history_iter(limit=None, page_size=2)] == [
+        "message 2", "message 1", "message 0"]
@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from velmu import breaker as breaker_module
+from velmu.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from velmu.commands import CommandManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker_module.time, 'monotonic', clock)
+    return clock
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_consecutive_failures_open_then_probe_closes(clock):
+    breaker = CircuitBreaker('api', failure_threshold=3, recovery_timeout=30)
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+    fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # une seule sonde à la fois
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker('api', failure_threshold=1, recovery_timeout=10)
+    fail(breaker)
+    clock.now += 10
+    fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_late_failures_while_open_do_not_push_back_the_probe(clock):
+    breaker = CircuitBreaker('api', failure_threshold=1, recovery_timeout=10)
+    for _ in range(3):
+        breaker.before_call()  # appels partis avant l'ouverture
+    breaker.record_failure()
+    clock.now += 8
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 2
+    assert breaker.state == HALF_OPEN
+    assert breaker.times_opened == 1
+    assert breaker.total_failures == 3
+
+
+def make_manager():
+    client = SimpleNamespace(user=SimpleNamespace(id='bot'))
+    return CommandManager(client, '!')
+
+
+def make_message(content):
+    replies = []
+    message = SimpleNamespace(content=content, author=SimpleNamespace(id='alice'), reply=replies.append)
+    return message, replies
+
+
+def test_failing_fallback_is_logged_not_raised():
+    manager = make_manager()
+
+    def fallback(message, args):
+        raise RuntimeError("fallback en panne")
+
+    @manager.command(name='meteo', fallback=fallback)
+    def meteo(message, args):
+        raise CircuitOpenError('meteo-api', 5)
+
+    message, _ = make_message('!meteo')
+    asyncio.run(manager.handle_message(message))
+
+
+def test_open_circuit_without_fallback_answers_right_away():
+    manager = make_manager()
+
+    @manager.command(name='meteo')
+    def meteo(message, args):
+        raise CircuitOpenError('meteo-api', 5)
+
+    message, replies = make_message('!meteo')
+    asyncio.run(manager.handle_message(message))
+    assert replies and "indisponible" in replies[0]
@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from gemini_memory import ConsolidationQueue, MemoryStore
+
+
+def test_start_raises_when_the_database_cannot_be_opened(tmp_path):
+    store = MemoryStore(str(tmp_path))  # un dossier n'est pas une base SQLite
+
+    with pytest.raises(sqlite3.OperationalError):
+        store.start()
+    assert store._thread is None
+
+
+def test_facts_survive_a_restart(tmp_path):
+    db_file = str(tmp_path / 'memory.db')
+    store = MemoryStore(db_file)
+    store.start()
+    store.set_facts('u1', 'alice', "aime les échecs")
+    store.close()
+
+    reopened = MemoryStore(db_file)
+    assert reopened.get_facts_sync('u1') == "aime les échecs"
+    reopened.close()
+
+
+def make_queue(**kwargs):
+    calls = []
+
+    async def consolidate(user_id, username, lines):
+        calls.append((user_id, lines))
+
+    return ConsolidationQueue(consolidate, **kwargs), calls
+
+
+def test_pending_users_stay_bounded():
+    async def scenario():
+        memory_queue, _ = make_queue(quiet_period=60, max_pending=2)
+        for user_id in ('u1', 'u2', 'u3'):
+            memory_queue.submit(user_id, user_id, "salut")
+        users = set(memory_queue._pending)
+        await memory_queue.stop()
+        return users
+
+    # Le plus ancien est abandonné
+    assert asyncio.run(scenario()) == {'u2', 'u3'}
+
+
+def test_lines_keep_the_tail():
+    async def scenario():
+        memory_queue, calls = make_queue(quiet_period=60, max_lines=3)
+        for i in range(10):
+            memory_queue.submit('u1', 'alice', f"ligne {i}\nligne {i + 1}")
+        assert len(memory_queue._pending['u1']['seen']) <= 6
+        await memory_queue.stop()
+        return calls
+
+    assert asyncio.run(scenario()) == [('u1', "ligne 8\nligne 9\nligne 10")]
+
+
+def test_stop_consolidates_entries_waiting_on_the_budget():
+    async def scenario():
+        memory_queue, calls = make_queue(quiet_period=0.01, calls_per_minute=1)
+        memory_queue.submit('u1', 'alice', "premier")
+        memory_queue.submit('u2', 'bob', "second")
+        await asyncio.sleep(0.2)  # u1 consolidé, u2 attend le budget
+        assert [user for user, _ in calls] == ['u1']
+        await memory_queue.stop()
+        return calls
+
+    assert [user for user, _ in asyncio.run(scenario())] == ['u1', 'u2']
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from loadgen import percentile  # noqa: E402
+
+
+@pytest.mark.parametrize('p, expected', [(50, 50), (95, 95), (99, 99), (100, 100), (0, 1), (0.5, 1)])
+def test_nearest_rank_percentile(p, expected):
+    assert percentile(list(range(100, 0, -1)), p) == expected
+
+
+def test_percentile_of_a_small_sample():
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([3.0, 1.0, 2.0], 99) == 3.0
+    assert percentile([], 50) != percentile([], 50)  # nan
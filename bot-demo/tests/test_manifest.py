@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from velmu.commands import CommandManager
+from velmu.manifest import build_manifest, read_manifest, scan_source, write_manifest
+
+COMMANDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'commands')
+
+STATIC = '''
+IMPORTED = True
+
+def setup(manager):
+    @manager.command(name="ping", description="Pong", category="Test")
+    def ping(message, args):
+        message.reply("pong")
+
+    @manager.command("echo")
+    def echo(message, args):
+        message.reply(" ".join(args))
+'''
+
+DYNAMIC = '''
+def setup(manager):
+    for name in ("a", "b"):
+        manager.command(name=name)(lambda message, args: None)
+'''
+
+
+def test_scan_source_reads_literal_decorators():
+    assert scan_source(STATIC) == [
+        {'name': 'ping', 'description': 'Pong', 'category': 'Test'},
+        {'name': 'echo', 'description': 'Pas de description', 'category': 'Général'},
+    ]
+
+
+def test_scan_source_gives_up_on_computed_names():
+    assert scan_source(DYNAMIC) is None
+    assert scan_source("def setup(manager):\n    manager.register_command(make())\n") is None
+
+
+def test_the_shipped_manifest_is_up_to_date():
+    with open(os.path.join(COMMANDS_DIR, 'manifest.json'), encoding='utf-8') as f:
+        shipped = json.load(f)
+    assert shipped == build_manifest(COMMANDS_DIR)
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    directory = tmp_path / 'lazycmds'
+    directory.mkdir()
+    (directory / '__init__.py').write_text('')
+    (directory / 'static.py').write_text(STATIC)
+    (directory / 'dynamic.py').write_text(DYNAMIC)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield directory
+    for name in [m for m in sys.modules if m.startswith('lazycmds')]:
+        del sys.modules[name]
+
+
+def test_stale_entries_are_scanned_again(package):
+    path = write_manifest(str(package))
+    (package / 'static.py').write_text(STATIC.replace('"echo"', '"repeat"'))
+
+    modules = read_manifest(path)
+
+    assert [c['name'] for c in modules['lazycmds.static']] == ['ping', 'repeat']
+    assert modules['lazycmds.dynamic'] is None
+
+
+def test_load_manifest_imports_modules_on_first_use(package):
+    manager = CommandManager(SimpleNamespace(user=SimpleNamespace(id='bot')), '!')
+    manager.load_manifest(write_manifest(str(package)))
+
+    assert 'lazycmds.dynamic' in sys.modules  # non décrit : importé au démarrage
+    assert 'lazycmds.static' not in sys.modules
+    assert {'ping', 'echo', 'a', 'b'} <= set(manager.commands)
+
+    replies = []
+    message = SimpleNamespace(content='!echo salut toi', author=SimpleNamespace(id='alice'), reply=replies.append)
+    asyncio.run(manager.handle_message(message))
+
+    assert 'lazycmds.static' in sys.modules
+    assert replies == ['salut toi']
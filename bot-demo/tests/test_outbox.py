@@ -0,0 +1,90 @@
+import threading
+import time
+
+from velmu.outbox import SendQueue, message_length
+
+
+class FakeHTTP:
+    def __init__(self):
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def _post_message(self, channel_id, content):
+        with self._lock:
+            self.posts.append((channel_id, content))
+            return {'id': str(len(self.posts)), 'content': content}
+
+
+def test_message_length_counts_utf16_units():
+    assert message_length("abc") == 3
+    assert message_length("é") == 1
+    assert message_length("🎉") == 2  # hors BMP : une paire de substitution côté JavaScript
+
+
+def test_messages_of_a_window_are_merged_in_order():
+    http = FakeHTTP()
+    outbox = SendQueue(http, window=0.05)
+    futures = [outbox.send('c1', f"Bienvenue {i}") for i in range(5)]
+    outbox.send('c2', "ailleurs")
+
+    results = [future.result(2) for future in futures]
+
+    assert sorted(http.posts) == [('c1', "\n".join(f"Bienvenue {i}" for i in range(5))), ('c2', "ailleurs")]
+    assert len({result['id'] for result in results}) == 1
+
+
+def test_unmerged_send_flushes_the_buffer_first():
+    http = FakeHTTP()
+    outbox = SendQueue(http, window=10)
+    outbox.send('c1', "premier")
+    outbox.send_now('c1', lambda: http._post_message('c1', "réponse"))
+
+    assert [content for _, content in http.posts] == ["premier", "réponse"]
+
+
+def test_batches_are_split_on_utf16_length():
+    http = FakeHTTP()
+    outbox = SendQueue(http, window=10, max_length=10)
+    outbox.send('c1', "🎉🎉")      # 4 unités UTF-16, 2 caractères Python
+    outbox.send('c1', "🎉🎉🎉")    # 4 + 1 + 6 = 11 > 10 : lot précédent envoyé d'abord
+    outbox.send('c1', "abc")       # 6 + 1 + 3 = 10 : fusionné
+    outbox.close()
+
+    assert [content for _, content in http.posts] == ["🎉🎉", "🎉🎉🎉\nabc"]
+    assert all(message_length(content) <= 10 for _, content in http.posts)
+
+
+def test_too_long_message_goes_alone_after_what_waits():
+    http = FakeHTTP()
+    outbox = SendQueue(http, window=10, max_length=10)
+    outbox.send('c1', "court")
+    outbox.send('c1', "x" * 11)
+
+    assert [content for _, content in http.posts] == ["court", "x" * 11]
+
+
+def test_window_flushes_without_close():
+    http = FakeHTTP()
+    outbox = SendQueue(http, window=0.02)
+    outbox.send('c1', "seul")
+    time.sleep(0.2)
+
+    assert http.posts == [('c1', "seul")]
+
+
+def test_failed_post_is_logged_and_idle_channels_are_forgotten(capsys):
+    class FailingHTTP(FakeHTTP):
+        def _post_message(self, channel_id, content):
+            if channel_id == 'down':
+                raise ConnectionError("backend injoignable")
+            return super()._post_message(channel_id, content)
+
+    outbox = SendQueue(FailingHTTP(), window=10)
+    failed = outbox.send('down', "bienvenue")
+    for i in range(20):
+        outbox.send(f'c{i}', "salut")
+    outbox.close()
+
+    assert isinstance(failed.exception(1), ConnectionError)
+    assert "backend injoignable" in capsys.readouterr().out
+    assert outbox._buffers == {}
@@ -0,0 +1,14 @@
+import pfc_bot
+from velmu.http import HTTPClient
+
+
+def test_expired_game_is_marked_through_a_content_edit(world, monkeypatch):
+    http = HTTPClient(world.token, api_url=f"{world.server.url}/api")
+    monkeypatch.setattr(pfc_bot.client, 'http', http)
+    sent = http.send_message(world.channel['id'], embed={'title': "Pierre, Feuille, Ciseau !"})
+
+    pfc_bot.expire_game(sent['id'], {'p1_name': 'alice'})
+
+    message = world.server.messages[sent['id']]
+    assert "expiré" in message['content']
+    assert message['embed']['title'] == "Pierre, Feuille, Ciseau !"
@@ -0,0 +1,85 @@
+import cProfile
+import pstats
+import threading
+import time
+import urllib.request
+
+import velmu
+
+
+def busy_sync_handler(deadline):
+    total = 0
+    while time.monotonic() < deadline:
+        total += 1
+    return total
+
+
+def test_cpu_mode_profiles_sync_handlers_on_socketio_threads(world, tmp_path):
+    client = velmu.Client(base_url=world.server.url)
+    client.profiler.output_dir = str(tmp_path)
+    handled = threading.Event()
+
+    @client.event
+    def on_message(message):
+        if message.author.id != client.user.id:
+            busy_sync_handler(time.monotonic() + 0.2)
+            handled.set()
+
+    world.connect(client)
+    try:
+        results = []
+        session = client.profile('cpu', seconds=1.0, callback=lambda *result: results.append(result))
+        time.sleep(0.2)
+        world.server.post_message(world.alice['id'], world.channel['id'], "salut")
+        assert handled.wait(10)
+        session.join(10)
+        path, summary = results[0]
+    finally:
+        client.close()
+
+    functions = {func for (_, _, func) in pstats.Stats(path).stats}
+    assert 'busy_sync_handler' in functions
+    assert "busy_sync_handler" in summary
+
+
+def test_control_socket_runs_a_session(world, tmp_path):
+    client = velmu.Client(base_url=world.server.url)
+    client.profiler.output_dir = str(tmp_path)
+    server = client.serve_profiler(0)
+    try:
+        port = server.server_port
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/profile?mode=memory&seconds=0.1', timeout=10) as r:
+            body = r.read().decode()
+        assert body.splitlines()[0].startswith(str(tmp_path))
+    finally:
+        server.shutdown()
+
+
+def test_sync_handlers_still_run_when_a_second_profiler_is_refused(world, tmp_path, monkeypatch):
+    # Python >= 3.12 : un seul cProfile actif par processus (sys.monitoring)
+    class SingleProfile(cProfile.Profile):
+        def enable(self):
+            if threading.current_thread().name != 'velmu-loop':
+                raise ValueError("Another profiling tool is already active")
+            super().enable()
+
+    monkeypatch.setattr(cProfile, 'Profile', SingleProfile)
+    client = velmu.Client(base_url=world.server.url)
+    client.profiler.output_dir = str(tmp_path)
+    handled = threading.Event()
+
+    @client.event
+    def on_message(message):
+        if message.author.id != client.user.id:
+            handled.set()
+
+    world.connect(client)
+    try:
+        session = client.profile('cpu', seconds=0.5)
+        time.sleep(0.1)
+        world.server.post_message(world.alice['id'], world.channel['id'], "salut")
+        assert handled.wait(10)
+        session.join(10)
+    finally:
+        client.close()
+    assert client._handler_errors.value(handler='on_message') == 0
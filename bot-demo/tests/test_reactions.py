@@ -0,0 +1,18 @@
+from velmu.http import HTTPClient
+
+
+def test_add_reactions_keeps_order_and_logs_failures(world, capsys):
+    http = HTTPClient(world.token, api_url=f"{world.server.url}/api")
+    http.reaction_interval = 0
+    sent = http.send_message(world.channel['id'], "Pierre, Feuille, Ciseau !")
+
+    http.add_reactions(sent['id'], ['🪨', '📄', '✂️']).result(10)
+    assert [r['emoji'] for r in world.server.messages[sent['id']]['reactions']] == ['🪨', '📄', '✂️']
+
+    def unreachable(message_id, emoji):
+        raise ConnectionError("backend injoignable")
+
+    http.add_reaction = unreachable
+    future = http.add_reactions(sent['id'], ['👍'])
+    assert isinstance(future.exception(10), ConnectionError)
+    assert "backend injoignable" in capsys.readouterr().out
@@ -0,0 +1,38 @@
+import time
+
+import velmu
+from velmu.recorder import EventRecorder, read_events
+
+
+def test_events_reach_the_file_before_close(tmp_path):
+    for name in ('events.jsonl', 'events.jsonl.gz'):
+        path = str(tmp_path / name)
+        recorder = EventRecorder(path, flush_interval=0)
+        recorder.record('new_message', {'id': 'm1'})
+
+        assert [(event, data) for _, event, data in read_events(path)] == [('new_message', {'id': 'm1'})]
+        recorder.close()
+
+
+def test_client_close_closes_the_recording(tmp_path):
+    client = velmu.Client(base_url='http://127.0.0.1:9')
+    path = str(tmp_path / 'events.jsonl.gz')
+    recorder = client.record(path)
+    recorder.record('new_message', {'id': 'm1'})
+
+    client.close()
+
+    assert client._recorder is None
+    assert [event for _, event, _ in read_events(path)] == ['new_message']
+
+
+def test_the_tail_of_a_burst_is_flushed_without_further_events(tmp_path):
+    path = str(tmp_path / 'events.jsonl.gz')
+    recorder = EventRecorder(path, flush_interval=0.05)
+    for i in range(3):
+        recorder.record('new_message', {'id': f'm{i}'})
+
+    time.sleep(0.3)  # plus aucun événement : seul le thread de flush peut écrire
+
+    assert [data['id'] for _, _, data in read_events(path)] == ['m0', 'm1', 'm2']
+    recorder.close()
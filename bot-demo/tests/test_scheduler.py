@@ -0,0 +1,68 @@
+import asyncio
+
+from velmu.scheduler import GenerationScheduler
+
+
+def test_requests_arriving_during_a_generation_are_coalesced():
+    batches = []
+
+    async def generate(ctx):
+        batches.append(list(ctx.requests))
+        await asyncio.sleep(0.05)
+
+    async def scenario():
+        scheduler = GenerationScheduler(generate, max_concurrent=1)
+        scheduler.submit('c1', 'm1')
+        await asyncio.sleep(0.01)
+        for request in ('m2', 'm3', 'm4'):
+            scheduler.submit('c1', request)
+        while scheduler.in_flight():
+            await asyncio.sleep(0.01)
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert batches == [['m1'], ['m2', 'm3', 'm4']]
+    assert scheduler.generations == 2
+
+
+def test_concurrency_is_capped_across_channels():
+    running = []
+    peak = []
+
+    async def generate(ctx):
+        running.append(ctx.channel_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.remove(ctx.channel_id)
+
+    async def scenario():
+        scheduler = GenerationScheduler(generate, max_concurrent=2)
+        for channel in range(5):
+            scheduler.submit(channel, 'salut')
+        while scheduler.in_flight():
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert len(peak) == 5 and max(peak) == 2
+
+
+def test_superseded_and_stale_requests():
+    seen = []
+
+    async def generate(ctx):
+        await asyncio.sleep(0.03)
+        seen.append((list(ctx.requests), ctx.superseded))
+
+    async def scenario():
+        scheduler = GenerationScheduler(generate, max_concurrent=1, max_age=0.02)
+        scheduler.submit('c1', 'vieux')
+        scheduler.submit('c2', 'en attente')  # attend le seul slot plus longtemps que max_age
+        await asyncio.sleep(0.01)
+        scheduler.submit('c1', 'nouveau')
+        while scheduler.in_flight():
+            await asyncio.sleep(0.01)
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert seen[0] == (['vieux'], True)
+    assert scheduler.dropped >= 1
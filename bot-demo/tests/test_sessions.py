@@ -0,0 +1,75 @@
+from velmu import sessions as sessions_module
+from velmu.sessions import SessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 10_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(sessions_module.time, 'monotonic', clock)
+    expired = []
+    store = SessionStore(on_expire=lambda key, value: expired.append(key), **kwargs)
+    store._ensure_thread = lambda: None  # la roue avance à la main (expire_due)
+    return store, clock, expired
+
+
+def test_sessions_expire_on_the_first_tick_after_their_deadline(monkeypatch):
+    store, clock, expired = make_store(monkeypatch, ttl=5, tick=1, slots=8)
+    store['a'] = 1
+    store.set('b', 2, ttl=3)
+
+    clock.now += 3.5
+    assert store.get('b') is None  # échue, même si la roue ne l'a pas encore retirée
+    assert store.expire_due() == 0
+    clock.now += 0.5
+    assert store.expire_due() == 1
+    assert expired == ['b'] and 'b' not in store
+    assert store['a'] == 1
+
+    clock.now += 2
+    store.expire_due()
+    assert expired == ['b', 'a'] and len(store) == 0
+
+
+def test_deadlines_beyond_one_revolution_wait_for_their_turn(monkeypatch):
+    store, clock, expired = make_store(monkeypatch, ttl=20, tick=1, slots=8)
+    store['long'] = 'x'
+
+    for _ in range(20):
+        clock.now += 1
+        store.expire_due()
+    assert expired == []
+
+    clock.now += 1
+    store.expire_due()
+    assert expired == ['long']
+
+
+def test_touch_renews_and_pop_does_not_notify(monkeypatch):
+    store, clock, expired = make_store(monkeypatch, ttl=5, tick=1, slots=8)
+    store['a'] = 1
+    store['b'] = 2
+    clock.now += 4
+    assert store.touch('a')
+    assert store.pop('b') == 2
+
+    clock.now += 2
+    store.expire_due()
+    assert expired == [] and store['a'] == 1
+    clock.now += 4
+    store.expire_due()
+    assert expired == ['a']
+
+
+def test_max_sessions_expires_the_oldest(monkeypatch):
+    store, _, expired = make_store(monkeypatch, ttl=60, max_sessions=2)
+    for key in ('a', 'b', 'c'):
+        store[key] = key
+    assert expired == ['a']
+    assert sorted(store) == ['b', 'c']
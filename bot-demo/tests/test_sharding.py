@@ -0,0 +1,40 @@
+import threading
+import time
+
+from velmu.sharding import HashRing, ShardedRunner
+
+
+def test_hash_ring_is_stable_and_moves_few_keys():
+    keys = [f'server-{i}' for i in range(1000)]
+    ring = HashRing(range(4))
+    before = {key: ring.node_for(key) for key in keys}
+    assert before == {key: ring.node_for(key) for key in keys}
+
+    ring.add(4)
+    moved = sum(before[key] != ring.node_for(key) for key in keys)
+    assert moved < len(keys) / 3
+
+
+def test_gateway_applies_the_subscriptions_declared_by_the_bot_module(world, monkeypatch):
+    other = world.server.add_channel(world.guild['id'], 'other')
+    monkeypatch.setenv('VELMU_TEST_CHANNEL', world.channel['id'])
+    runner = ShardedRunner('shard_bot:client', world.token, workers=2, base_url=world.server.url)
+    thread = threading.Thread(target=runner.run, kwargs={'reconnect': False}, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 30
+        while runner.gateway.user is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert runner.gateway.subscriptions['channels'] == {world.channel['id']}
+
+        world.server.post_message(world.alice['id'], other['id'], "hors scope")
+        world.server.post_message(world.alice['id'], world.channel['id'], "dans le scope")
+        replies = []
+        while not replies and time.monotonic() < deadline:
+            time.sleep(0.05)
+            replies = [m for m in list(world.server.messages.values()) if m['userId'] == world.bot['id']]
+        time.sleep(0.3)
+        replies = [m['content'] for m in list(world.server.messages.values()) if m['userId'] == world.bot['id']]
+    finally:
+        runner.stop()
+    assert replies == ["vu : dans le scope"]
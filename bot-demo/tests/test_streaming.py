@@ -0,0 +1,50 @@
+import asyncio
+
+from velmu.http import HTTPClient
+from velmu.streaming import split_message, stream_reply
+
+
+class BlockedChunk:
+    @property
+    def text(self):
+        raise ValueError("The candidate's response was blocked")
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+def bot_messages(world):
+    return [m['content'] for m in list(world.server.messages.values()) if m['userId'] == world.bot['id']]
+
+
+def test_split_message_prefers_line_breaks_and_keeps_everything():
+    text = "\n".join(f"ligne {i:04d} " + "x" * 40 for i in range(100))
+
+    parts = split_message(text, 2000)
+
+    assert all(len(part) <= 2000 for part in parts)
+    assert "\n".join(parts) == text
+
+
+def test_long_reply_overflows_into_follow_up_messages(world):
+    http = HTTPClient(world.token, api_url=f"{world.server.url}/api")
+    chunks = [f"Paragraphe {i}. " + "mot " * 100 + "\n" for i in range(12)]
+
+    text = asyncio.run(stream_reply(http, world.channel['id'], chunks, min_interval=0))
+
+    messages = bot_messages(world)
+    assert len(messages) == 3
+    assert all(len(m) <= 2000 for m in messages)
+    assert " ".join(messages).split() == text.split()
+
+
+def test_blocked_chunks_are_skipped(world):
+    http = HTTPClient(world.token, api_url=f"{world.server.url}/api")
+    chunks = [Chunk("Bonjour"), BlockedChunk(), Chunk(" à tous")]
+
+    text = asyncio.run(stream_reply(http, world.channel['id'], chunks, min_interval=0))
+
+    assert text == "Bonjour à tous"
+    assert bot_messages(world) == ["Bonjour à tous"]
@@ -0,0 +1,44 @@
+import threading
+
+import velmu
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def test_streamed_reply_and_async_history_stay_in_the_event_trace(world):
+    client = velmu.Client(base_url=world.server.url)
+    exporter = client.tracer.add_exporter(ListExporter())
+    done = threading.Event()
+
+    @client.event
+    async def on_message(message):
+        if message.author.id == client.user.id:
+            return
+        try:
+            await message.stream_reply(["Bonjour", " tout", " le monde"], min_interval=0)
+            async for _ in message.channel.history_iter(limit=5, page_size=2):
+                pass
+        finally:
+            done.set()
+
+    world.connect(client)
+    try:
+        posted = world.server.post_message(world.alice['id'], world.channel['id'], "salut")
+        assert done.wait(10)
+    finally:
+        client.close()
+
+    event = next(s for s in exporter.spans
+                 if s.kind == 'event' and s.attributes.get('message_id') == posted['id'])
+    calls = [s for s in exporter.spans
+             if s.kind == 'request' and s.attributes.get('endpoint', '').startswith('/messages')]
+    methods = {s.attributes['method'] for s in calls}
+    assert {'POST', 'PUT', 'GET'} <= methods
+    assert all(s.trace_id == event.trace_id for s in calls), [
+        (s.name, s.trace_id) for s in calls if s.trace_id != event.trace_id]
@@ -1,3 +1,68 @@
-from .client import Client
-from .models import Message, User, Channel
-from .embed import Embed
+"""
+Velmu bot SDK
+
+Names are imported on first access (PEP 562): `import velmu` or `velmu.Embed`
+does not load socketio, requests or asyncio; `velmu.Client` does. Every
+submodule (velmu.embed, velmu.metrics...) can also be imported on its own.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+# nom public -> sous-module qui le définit
+_EXPORTS = {
+    'Client': 'client',
+    'Message': 'models', 'User': 'models', 'Channel': 'models',
+    'Embed': 'embed',
+    'CircuitBreaker': 'breaker', 'CircuitOpenError': 'breaker',
+    'HistoryStore': 'history',
+    'GenerationScheduler': 'scheduler',
+    'StreamingReply': 'streaming', 'stream_reply': 'streaming',
+    'EventRecorder': 'recorder', 'EventReplayer': 'recorder',
+    'MetricsRegistry': 'metrics',
+    'Tracer': 'tracing', 'FileSpanExporter': 'tracing', 'current_span': 'tracing',
+    'Profiler': 'profiling',
+    'SessionStore': 'sessions',
+    'MessageIterator': 'pagination',
+    'BotRunner': 'runner',
+    'ShardedRunner': 'sharding', 'HashRing': 'sharding',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        # velmu.sharding, velmu.commands... sans import explicite
+        try:
+            return importlib.import_module(f'.{name}', __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .models import Message, User, Channel
+    from .embed import Embed
+    from .breaker import CircuitBreaker, CircuitOpenError
+    from .history import HistoryStore
+    from .scheduler import GenerationScheduler
+    from .streaming import StreamingReply, stream_reply
+    from .recorder import EventRecorder, EventReplayer
+    from .metrics import MetricsRegistry
+    from .tracing import Tracer, FileSpanExporter, current_span
+    from .profiling import Profiler
+    from .sessions import SessionStore
+    from .pagination import MessageIterator
+    from .runner import BotRunner
+    from .sharding import ShardedRunner, HashRing
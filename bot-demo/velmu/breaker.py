@@ -0,0 +1,137 @@
+"""
+Circuit breakers for outbound calls to third-party APIs
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the upstream breaker is open"""
+    def __init__(self, upstream: str, retry_in: float):
+        super().__init__(f"Circuit ouvert pour {upstream} (nouvel essai dans {retry_in:.0f}s)")
+        self.upstream = upstream
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of one upstream and short-circuits calls while it is failing.
+
+    closed    -> calls go through; `failure_threshold` consecutive failures open the circuit
+    open      -> calls fail immediately with CircuitOpenError for `recovery_timeout` seconds
+    half_open -> a single probe call is let through; success closes, failure re-opens
+    """
+    def __init__(self, name: str, failure_threshold: int = 3, recovery_timeout: float = 30.0,
+                 window: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.window = window
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        # Recent outcomes (timestamp, ok) used for the error rate
+        self._recent: Deque[Tuple[float, bool]] = deque(maxlen=1000)
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self):
+        """Reserve a call slot, raising CircuitOpenError if the circuit refuses it"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == OPEN:
+                self.total_rejected += 1
+                raise CircuitOpenError(self.name, self.recovery_timeout - (now - self._opened_at))
+            if state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self.total_rejected += 1
+                    raise CircuitOpenError(self.name, 0)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._record(True)
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._state = CLOSED
+
+    def record_failure(self):
+        now = time.monotonic()
+        with self._lock:
+            self._record(False)
+            state = self._current_state(now)
+            if state == OPEN:
+                # Late failure of a call started before the circuit opened: it must not
+                # push back the half-open probe
+                return
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self.times_opened += 1
+                print(f"⚡ Circuit ouvert pour {self.name}")
+                self._state = OPEN
+                self._opened_at = now
+
+    def _record(self, ok: bool):
+        self.total_calls += 1
+        if not ok:
+            self.total_failures += 1
+        self._recent.append((time.monotonic(), ok))
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run `func` through the breaker; any exception counts as a failure"""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def error_rate(self) -> float:
+        """Share of failed calls over the last `window` seconds"""
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            recent = [ok for ts, ok in self._recent if ts >= cutoff]
+        if not recent:
+            return 0.0
+        return recent.count(False) / len(recent)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'error_rate': round(self.error_rate(), 4),
+            'calls': self.total_calls,
+            'failures': self.total_failures,
+            'rejected': self.total_rejected,
+            'times_opened': self.times_opened,
+        }
+
+    def __repr__(self) -> str:
+        return f"<CircuitBreaker name={self.name!r} state={self.state}>"
@@ -1,42 +1,271 @@
-import socketio
+import os
 import asyncio
 import inspect
+import random
+import threading
+import time
+from collections import OrderedDict
 from .http import HTTPClient
+from .metrics import MetricsRegistry
+from .tracing import Tracer
+from .profiling import Profiler
+from .sessions import SessionStore
 from .models import Message, User, Reaction, Server, Channel
+from .recorder import EventRecorder
 
 class Client:
-    def __init__(self):
-        self.sio = socketio.Client()
+    def __init__(self, base_url=None):
+        # Adresse du backend Velmu (surchargée par VELMU_URL, ex: serveur de test local)
+        self.base_url = base_url or os.getenv('VELMU_URL', 'http://localhost:4000')
+        # Reconnexion gérée par run() (backoff + rattrapage), pas par socketio
+        import socketio  # différé : `import velmu` ne charge pas socketio
+        self.sio = socketio.Client(reconnection=False)
         self.http = None
         self.user = None
         self._events = {}
         
-        # Création d'une boucle d'événements persistante pour ce client
+        # Création d'une boucle d'événements persistante pour ce client.
+        # Elle tourne en continu dans son propre thread, ce qui permet aux handlers
+        # async de lancer des tâches de fond qui continuent entre deux événements.
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self._loop_thread = None
+        self._recorder = None
+        # Pool HTTP et threads d'arrière-plan fournis par un BotRunner (sinon propres à ce client)
+        self._session = None
+        self._executor = None
+
+        # Métriques (voir velmu.metrics) : client.metrics.snapshot() ou client.serve_metrics(9100)
+        self.metrics = MetricsRegistry()
+        self._event_seconds = self.metrics.histogram(
+            'velmu_event_dispatch_seconds', "Temps de traitement des événements du gateway", ('event',))
+        self._handler_errors = self.metrics.counter(
+            'velmu_handler_errors_total', "Exceptions levées par les handlers utilisateur", ('handler',))
+        self._in_flight = self.metrics.gauge(
+            'velmu_dispatch_in_flight', "Événements du gateway en cours de traitement")
+        self.metrics.gauge('velmu_loop_pending_tasks', "Tâches en attente sur la boucle du client",
+                           func=lambda: len(asyncio.all_tasks(self.loop)) if self.loop.is_running() else 0)
+
+        # Abonnements du gateway (voir subscribe) : vides = tout ce que le bot peut voir
+        self._scope_servers = set()
+        self._scope_channels = set()
+        self._channel_servers = {}
+        self._left_servers = set()
+        self._joined_channels = set()
+        self._scope_lock = threading.Lock()
+
+        # Rattrapage après reconnexion : dernier message vu par salon et IDs déjà dispatchés
+        self._last_seen = {}
+        self._recent_ids = OrderedDict()
+        self._connections = 0
+        self._closing = False
+
+        # Intérêts déclarés pour les réactions (voir watch_reactions) :
+        # message_id -> (emojis, users), None = pas de filtre sur ce critère
+        self._reaction_interests = None
+
+        # Traçage (voir velmu.tracing) : inactif tant qu'aucun hook / exporteur n'est enregistré
+        self.tracer = Tracer()
+        self.profiler = Profiler(self)
 
         # Enregistrement des handlers internes
         self.sio.on('connect', self._on_connect)
-        self.sio.on('new_message', self._on_message_received)
-        self.sio.on('member_added', self._on_member_added)
-        self.sio.on('member_removed', self._on_member_removed)
-        self.sio.on('message_reaction_add', self._on_reaction_add)
-        self.sio.on('message_reaction_remove', self._on_reaction_remove)
+        self._gateway_handlers = {
+            'new_message': self._on_message_received,
+            'member_added': self._on_member_added,
+            'member_removed': self._on_member_removed,
+            'message_reaction_add': self._on_reaction_add,
+            'message_reaction_remove': self._on_reaction_remove,
+        }
+        for event_name in self._gateway_handlers:
+            self.sio.on(event_name, self._make_receiver(event_name))
 
     def event(self, func):
         """Décorateur pour enregistrer un événement."""
         self._events[func.__name__] = func
         return func
 
-    def run(self, token):
-        """Lance le bot."""
-        self.http = HTTPClient(token)
-        try:
-            # Authentification via handshake (requis par le serveur)
-            self.sio.connect('http://localhost:4000', auth={'token': token})
-            self.sio.wait()
-        except Exception as e:
-            print(f"Erreur de connexion : {e}")
+    def run(self, token, reconnect=True, max_delay=60.0):
+        """
+        Lance le bot. En cas d'échec de connexion ou de déconnexion, réessaie avec un
+        délai exponentiel aléatoire (1s, 2s, 4s... plafonné à `max_delay`), puis rattrape
+        les messages manqués (voir _backfill).
+        """
+        self.http = HTTPClient(token, api_url=f"{self.base_url}/api", metrics=self.metrics, tracer=self.tracer,
+                                session=self._session, executor=self._executor)
+        self._closing = False
+        attempt = 0
+        while not self._closing:
+            try:
+                # Authentification via handshake (requis par le serveur)
+                self.sio.connect(self.base_url, auth={'token': token})
+                attempt = 0
+                self.sio.wait()
+            except Exception as e:
+                print(f"Erreur de connexion : {e}")
+            if not reconnect or self._closing:
+                break
+            delay = backoff_delay(attempt, max_delay=max_delay)
+            attempt += 1
+            print(f"🔌 Déconnecté, nouvelle tentative dans {delay:.1f}s (essai {attempt})")
+            time.sleep(delay)
+
+    def close(self):
+        """Arrête run() et ferme la connexion."""
+        self._closing = True
+        if self.http is not None:
+            self.http.flush_messages()
+        self.stop_recording()
+        if self.sio.connected:
+            self.sio.disconnect()
+
+    # --- Enregistrement du trafic ---
+    def record(self, path, flush_interval=1.0):
+        """Enregistre tous les événements reçus dans `path` (voir velmu.recorder), jusqu'à close()."""
+        self.stop_recording()
+        meta = {'user': {'id': self.user.id, 'username': self.user.username,
+                         'discriminator': self.user.discriminator, 'isBot': self.user.is_bot}} if self.user else {}
+        self._recorder = EventRecorder(path, meta, flush_interval=flush_interval)
+        return self._recorder
+
+    def stop_recording(self):
+        if self._recorder:
+            self._recorder.close()
+            self._recorder = None
+
+    # --- Métriques ---
+    def serve_metrics(self, port=9100, host='127.0.0.1'):
+        """Expose les métriques au format texte Prometheus sur http://host:port/metrics."""
+        return self.metrics.serve(port, host)
+
+    # --- Profilage ---
+    def profile(self, mode='sample', seconds=30, callback=None):
+        """Profile le processus en cours pendant `seconds` (voir velmu.profiling) sans bloquer."""
+        return self.profiler.start(mode, seconds, callback)
+
+    def serve_profiler(self, port=9101, host='127.0.0.1'):
+        """Socket de contrôle local : GET http://host:port/profile?mode=cpu&seconds=30."""
+        return self.profiler.serve(port, host)
+
+    def _make_receiver(self, event_name):
+        return lambda data: self._receive(event_name, data)
+
+    def _receive(self, event_name, data):
+        """Point d'entrée unique des événements du gateway (réels ou rejoués)."""
+        if self._recorder:
+            self._recorder.record(event_name, data)
+        handler = self._gateway_handlers.get(event_name)
+        if handler:
+            span = None
+            if self.tracer.enabled:
+                attributes = {'message_id': data.get('id'), 'channel_id': data.get('channelId')} \
+                    if event_name == 'new_message' and isinstance(data, dict) else {}
+                span = self.tracer.start_span(event_name, 'event', hook='on_event_received', root=True, **attributes)
+            self._in_flight.inc()
+            start = time.perf_counter()
+            try:
+                handler(data)
+            finally:
+                self._event_seconds.observe(time.perf_counter() - start, event=event_name)
+                self._in_flight.dec()
+                if span:
+                    self.tracer.end_span(span)
+
+    # --- Abonnements ---
+    def subscribe(self, servers=(), channels=()):
+        """
+        Restreint les événements reçus à ces serveurs (tous leurs salons) et salons.
+        Le bot quitte les rooms des autres serveurs et rejoint uniquement les salons
+        demandés : le trafic non voulu n'est plus envoyé par le backend. Peut être
+        appelé avant run() ou à tout moment ensuite.
+        Note : les événements de membres d'un serveur ne sont reçus que si le serveur
+        entier est abonné.
+        """
+        self._scope_servers.update(str(s) for s in servers)
+        self._scope_channels.update(str(c) for c in channels)
+        self._apply_subscriptions()
+
+    def unsubscribe(self, servers=(), channels=()):
+        self._scope_servers.difference_update(str(s) for s in servers)
+        self._scope_channels.difference_update(str(c) for c in channels)
+        self._apply_subscriptions()
+
+    def clear_subscriptions(self):
+        """Revient à la réception de tout ce que le bot peut voir."""
+        self._scope_servers.clear()
+        self._scope_channels.clear()
+        self._apply_subscriptions()
+
+    @property
+    def subscriptions(self):
+        return {'servers': set(self._scope_servers), 'channels': set(self._scope_channels)}
+
+    def _apply_subscriptions(self):
+        """Aligne les rooms rejointes sur les abonnements déclarés (si connecté)."""
+        if self.http is None or not self.sio.namespaces:
+            return
+        with self._scope_lock:
+            if self._scope_servers or self._scope_channels:
+                my_servers = {str(s['id']) for s in (self.http.get_my_servers() or []) if isinstance(s, dict)}
+                leave = my_servers - self._scope_servers
+                channels = {c for c in self._scope_channels if self._server_of(c) not in self._scope_servers}
+            else:
+                leave, channels = set(), set()
+
+            # On quitte avant de rejoindre : jamais de doublon (room serveur + room salon)
+            for server_id in leave - self._left_servers:
+                self.sio.emit('leave_server', server_id)
+            for channel_id in self._joined_channels - channels:
+                self.sio.emit('leave_channel', channel_id)
+            for server_id in self._left_servers - leave:
+                self.sio.emit('join_server', server_id)
+            for channel_id in channels - self._joined_channels:
+                self.sio.emit('join_channel', channel_id)
+            self._left_servers, self._joined_channels = leave, channels
+
+    def _server_of(self, channel_id):
+        if channel_id not in self._channel_servers:
+            self._channel_servers[channel_id] = self.http.get_server_id_from_channel(channel_id)
+        return self._channel_servers[channel_id]
+
+    def _in_scope(self, data):
+        """Filet de sécurité côté client (pendant un changement d'abonnements)."""
+        if not (self._scope_servers or self._scope_channels):
+            return True
+        return data.get('serverId') in self._scope_servers or data.get('channelId') in self._scope_channels
+
+    # --- Réactions ciblées ---
+    def watch_reactions(self, message_id, emojis=None, users=None, ttl=3600):
+        """
+        Déclare un intérêt pour les réactions d'un message. Dès le premier appel, les
+        réactions qui ne correspondent à aucun intérêt sont ignorées avant même la
+        création de l'objet Reaction et l'appel de on_reaction_add / on_reaction_remove.
+
+        Args:
+            emojis: emojis acceptés (None = tous)
+            users: IDs des utilisateurs acceptés (None = tous)
+            ttl: durée de vie de l'intérêt en secondes
+        """
+        if self._reaction_interests is None:
+            self._reaction_interests = SessionStore(ttl=ttl)
+        self._reaction_interests.set(message_id, (frozenset(emojis) if emojis is not None else None,
+                                                  frozenset(users) if users is not None else None), ttl=ttl)
+
+    def unwatch_reactions(self, message_id):
+        if self._reaction_interests is not None:
+            self._reaction_interests.pop(message_id)
+
+    def _wants_reaction(self, data):
+        """Filtre sur le payload brut, sans rien allouer."""
+        interests = self._reaction_interests
+        if interests is None:
+            return True
+        raw = data.get('reaction') or data
+        interest = interests.get(raw.get('messageId'))
+        if interest is None:
+            return False
+        emojis, users = interest
+        return (emojis is None or raw.get('emoji') in emojis) and (users is None or raw.get('userId') in users)
 
     # --- Helpers ---
     def get_server(self, server_id):
@@ -58,6 +287,45 @@ class Client:
         # Pour l'instant on ne peut pas récupérer un user arbitraire facilement sans endpoint public
         pass
 
+    # --- Boucle & dispatch ---
+    def _ensure_loop(self):
+        if self._loop_thread is None:
+            self._loop_thread = threading.Thread(target=self.loop.run_forever, name='velmu-loop', daemon=True)
+            self._loop_thread.start()
+
+    def run_coroutine(self, coro):
+        """Exécute une coroutine sur la boucle du client et attend son résultat."""
+        self._ensure_loop()
+        if threading.current_thread() is self._loop_thread:
+            # Déjà sur la boucle : on ne peut pas attendre sans bloquer, on planifie
+            return self.loop.create_task(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def _dispatch(self, name, *args):
+        """Appelle le handler utilisateur `name` s'il existe (sync ou async)."""
+        handler = self._events.get(name)
+        if handler is None:
+            return
+        span = self.tracer.start_span(name, 'handler') if self.tracer.enabled else None
+        # Mode cpu du profiler : les handlers sync tournent hors de la boucle, on les profile ici
+        capture = None
+        error = None
+        try:
+            capture = self.profiler.capture_start()
+            if inspect.iscoroutinefunction(handler):
+                self.run_coroutine(handler(*args))
+            else:
+                handler(*args)
+        except Exception as e:
+            error = e
+            self._handler_errors.inc(handler=name)
+            print(f"Erreur dans {name} : {e}")
+        finally:
+            if capture is not None:
+                self.profiler.capture_end(capture)
+            if span:
+                self.tracer.end_span(span, hook='on_handler_done', error=error)
+
     def _on_connect(self):
         print('Connecté au serveur Socket.IO')
         try:
@@ -66,75 +334,100 @@ class Client:
             if user_data:
                 self.user = User(user_data, self.http)
                 print(f'Authentifié en tant que {self.user}')
+
+                # À chaque (re)connexion le backend réabonne le bot à tous ses serveurs
+                self._left_servers, self._joined_channels = set(), set()
+                self._apply_subscriptions()
+                self._connections += 1
+                if self._connections > 1:
+                    self._backfill()
                 
                 # Déclenche l'événement on_ready s'il existe
-                if 'on_ready' in self._events:
-                    handler = self._events['on_ready']
-                    if inspect.iscoroutinefunction(handler):
-                        self.loop.run_until_complete(handler())
-                    else:
-                        handler()
+                self._dispatch('on_ready')
         except Exception as e:
             print(f"Erreur lors de la récupération du profil : {e}")
 
     # _on_authenticated supprimé car non utilisé par le serveur
 
-    def _on_message_received(self, data):
+    def _accept_message(self, data, backfilled=False):
+        """Abonnements, dédoublonnage et point de reprise : False si le message est ignoré."""
+        if not self._in_scope(data):
+            return False
+        message_id = data.get('id')
+        if message_id in self._recent_ids:
+            # Déjà reçu (rattrapage et direct qui se chevauchent)
+            return False
+        self._recent_ids[message_id] = None
+        if len(self._recent_ids) > 2000:
+            self._recent_ids.popitem(last=False)
+        if data.get('channelId') and not backfilled:
+            self._last_seen[data['channelId']] = (message_id, data.get('serverId'), data.get('createdAt'))
+        return True
+
+    def _on_message_received(self, data, backfilled=False):
+        if not self._accept_message(data, backfilled):
+            return
+
         # Conversion des données brutes en objet Message
         message = Message(data, self.http)
+        message.backfilled = backfilled
         
         # Déclenche l'événement on_message s'il existe
-        if 'on_message' in self._events:
-            handler = self._events['on_message']
-            try:
-                if inspect.iscoroutinefunction(handler):
-                    self.loop.run_until_complete(handler(message))
-                else:
-                    handler(message)
-            except Exception as e:
-                print(f"Erreur dans on_message : {e}")
+        self._dispatch('on_message', message)
 
         # Déclenche l'événement on_reply s'il existe et si c'est une réponse
-        if message.reply_to_id and 'on_reply' in self._events:
-            handler = self._events['on_reply']
-            try:
-                if inspect.iscoroutinefunction(handler):
-                    self.loop.run_until_complete(handler(message))
-                else:
-                    handler(message)
-            except Exception as e:
-                print(f"Erreur dans on_reply : {e}")
+        if message.reply_to_id:
+            self._dispatch('on_reply', message)
+
+    def _backfill(self, page_size=50, max_messages=500):
+        """
+        Rattrape, salon par salon, les messages envoyés pendant la déconnexion : on remonte
+        la pagination par curseur jusqu'au dernier message vu (ou jusqu'à sa date s'il a été
+        supprimé entre-temps), puis on les dispatche dans l'ordre chronologique avec
+        message.backfilled = True.
+        """
+        # Seuls les salons où l'on a déjà vu passer un message ont un point de reprise fiable
+        total = 0
+        for channel_id, (last_id, server_id, last_at) in list(self._last_seen.items()):
+            missed, cursor = [], None
+            while len(missed) < max_messages:
+                page = self.http.get_channel_messages(channel_id, limit=page_size, cursor=cursor)
+                if not isinstance(page, list) or not page:
+                    break
+                ids = [m.get('id') for m in page]
+                if last_id in ids:
+                    missed.extend(page[:ids.index(last_id)])
+                    break
+                # Dernier message vu supprimé : on s'arrête aux messages plus anciens que lui
+                newer = [m for m in page if not (last_at and m.get('createdAt')) or m['createdAt'] >= last_at]
+                missed.extend(newer)
+                if len(newer) < len(page):
+                    break
+                cursor = ids[-1]
+            for data in reversed(missed):
+                data.setdefault('serverId', server_id)
+                self._on_message_received(data, backfilled=True)
+            if missed:
+                self._last_seen[channel_id] = (missed[0].get('id'), server_id, missed[0].get('createdAt'))
+            total += len(missed)
+        if total:
+            print(f"📥 {total} message(s) rattrapé(s) après la reconnexion")
 
     def _on_member_added(self, data):
-        if 'on_member_join' in self._events:
-            handler = self._events['on_member_join']
-            if inspect.iscoroutinefunction(handler):
-                self.loop.run_until_complete(handler(data))
-            else:
-                handler(data)
+        self._dispatch('on_member_join', data)
 
     def _on_member_removed(self, data):
-        if 'on_member_leave' in self._events:
-            handler = self._events['on_member_leave']
-            if inspect.iscoroutinefunction(handler):
-                self.loop.run_until_complete(handler(data))
-            else:
-                handler(data)
+        self._dispatch('on_member_leave', data)
 
     def _on_reaction_add(self, data):
-        if 'on_reaction_add' in self._events:
-            reaction = Reaction(data, self.http)
-            handler = self._events['on_reaction_add']
-            if inspect.iscoroutinefunction(handler):
-                self.loop.run_until_complete(handler(reaction))
-            else:
-                handler(reaction)
+        if 'on_reaction_add' in self._events and self._wants_reaction(data):
+            self._dispatch('on_reaction_add', Reaction(data, self.http))
 
     def _on_reaction_remove(self, data):
-        if 'on_reaction_remove' in self._events:
-            reaction = Reaction(data, self.http)
-            handler = self._events['on_reaction_remove']
-            if inspect.iscoroutinefunction(handler):
-                self.loop.run_until_complete(handler(reaction))
-            else:
-                handler(reaction)
+        if 'on_reaction_remove' in self._events and self._wants_reaction(data):
+            self._dispatch('on_reaction_remove', Reaction(data, self.http))
+
+
+def backoff_delay(attempt, base=1.0, max_delay=60.0):
+    """Délai exponentiel avec gigue complète : uniforme dans [0, min(max_delay, base * 2^attempt)]."""
+    return random.uniform(0, min(max_delay, base * (2 ** attempt)))
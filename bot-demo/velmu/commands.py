@@ -1,14 +1,26 @@
+import importlib
 import inspect
+import os
+import sys
+import threading
+import time
 from typing import Callable, List, Optional, Dict, Any
 from .embed import Embed
+from .breaker import CircuitOpenError
+from .metrics import MetricsRegistry
+from .profiling import MODES, Profiler, ProfilerBusyError
 
 class Command:
     """Represents a bot command"""
-    def __init__(self, name: str, description: str, category: str, callback: Callable):
+    def __init__(self, name: str, description: str, category: str, callback: Callable,
+                 fallback: Optional[Callable] = None):
         self.name = name
         self.description = description
         self.category = category
         self.callback = callback
+        self.fallback = fallback
+        self.timer = None  # histogram series bound by CommandManager.register_command
+        self.module = getattr(callback, '__module__', None)  # replaced together on CommandManager.reload
 
 class CommandManager:
     """Manages command registration and execution"""
@@ -17,24 +29,209 @@ class CommandManager:
         self.prefix = prefix
         self.commands: Dict[str, Command] = {}
         self.categories: Dict[str, List[Command]] = {}
+        self.modules: Dict[str, Any] = {}
+        self._lazy_modules: set = set()  # listed by load_manifest, imported on first use
+        self._staging: Optional[List[Command]] = None
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watching = threading.Event()
 
-    def command(self, name: str = None, description: str = "Pas de description", category: str = "Général"):
-        """Decorator to register a command"""
+        metrics = getattr(client, 'metrics', None) or MetricsRegistry()
+        self._command_seconds = metrics.histogram(
+            'velmu_command_duration_seconds', "Temps d'exécution des commandes", ('command',))
+        self._command_errors = metrics.counter(
+            'velmu_command_errors_total', "Commandes terminées en erreur (fallback compris)", ('command', 'error'))
+
+    def command(self, name: str = None, description: str = "Pas de description", category: str = "Général",
+                fallback: Optional[Callable] = None):
+        """
+        Decorator to register a command
+        Args:
+            fallback: Optional callable (message, args) served instead of the command when
+                      its upstream API is down (open circuit) or the command fails
+        """
         def decorator(func):
             cmd_name = name or func.__name__
-            cmd = Command(cmd_name, description, category, func)
+            cmd = Command(cmd_name, description, category, func, fallback)
             self.register_command(cmd)
             return func
         return decorator
 
     def register_command(self, command: Command):
         """Register a command manually"""
+        command.timer = self._command_seconds.labels(command=command.name)
+        if self._staging is not None:
+            # Inside reload(): swapped in all at once when setup() is done
+            self._staging.append(command)
+            return
         self.commands[command.name] = command
         if command.category not in self.categories:
             self.categories[command.category] = []
         self.categories[command.category].append(command)
         print(f"✅ Commande chargée : {command.name}")
 
+    # --- Modules de commandes ---
+    def load(self, module_name: str):
+        """Import a command module and call its setup(manager)"""
+        module = importlib.import_module(module_name)
+        if hasattr(module, 'setup'):
+            module.setup(self)
+        self.modules[module_name] = module
+        return module
+
+    def reload(self, module) -> List[Command]:
+        """
+        Re-import a command module (name or module object) and replace its commands.
+
+        The new commands are collected first, then `commands` and `categories` are
+        swapped in one assignment each: a message never sees a half-reloaded module.
+        If the module fails to import or set up, the old commands stay in place and
+        the error is raised.
+        """
+        module_name = module if isinstance(module, str) else module.__name__
+        with self._reload_lock:
+            if module_name in sys.modules:
+                module = importlib.reload(sys.modules[module_name])
+            else:
+                module = importlib.import_module(module_name)
+            staged = self._install(module_name, module)
+        print(f"🔄 Module rechargé : {module_name} ({len(staged)} commande(s))")
+        return staged
+
+    def _install(self, module_name: str, module) -> List[Command]:
+        """Run module.setup() aside, then swap its commands in (caller holds _reload_lock)"""
+        self._staging = []
+        try:
+            if hasattr(module, 'setup'):
+                module.setup(self)
+            staged = self._staging
+        finally:
+            self._staging = None
+
+        commands = {name: cmd for name, cmd in self.commands.items() if cmd.module != module_name}
+        commands.update((cmd.name, cmd) for cmd in staged)
+        categories: Dict[str, List[Command]] = {}
+        for cmd in commands.values():
+            categories.setdefault(cmd.category, []).append(cmd)
+        self.commands, self.categories = commands, categories
+        self.modules[module_name] = module
+        self._lazy_modules.discard(module_name)
+        return staged
+
+    def load_manifest(self, path: str):
+        """
+        Register the commands listed in a manifest (see velmu.manifest) without
+        importing their modules: each module is imported on the first use of one of
+        its commands. Modules the manifest cannot describe are imported right away.
+        """
+        from .manifest import read_manifest
+
+        for module_name, entries in read_manifest(path).items():
+            if entries is None:
+                self.load(module_name)
+                continue
+            for entry in entries:
+                command = Command(entry['name'], entry['description'], entry['category'], None)
+                command.module = module_name
+                self.register_command(command)
+            self._lazy_modules.add(module_name)
+
+    def _resolve_lazy(self, command: Command) -> Optional[Command]:
+        """Import the module behind a manifest placeholder; the real command (or None)"""
+        with self._reload_lock:
+            if command.module in self._lazy_modules:
+                start = time.perf_counter()
+                try:
+                    self._install(command.module, importlib.import_module(command.module))
+                except Exception as e:
+                    print(f"❌ Erreur chargement {command.module}: {e}")
+                    return None
+                print(f"📦 Module chargé à la demande : {command.module} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        resolved = self.commands.get(command.name)
+        return resolved if resolved is not None and resolved.callback is not None else None
+
+    def watch(self, interval: float = 1.0) -> threading.Thread:
+        """
+        Reload the loaded command modules whenever their file changes (polls mtimes
+        every `interval` seconds in the `velmu-reload` thread).
+        """
+        if self._watcher and self._watcher.is_alive():
+            return self._watcher
+        self._watching.set()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name='velmu-reload', daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def stop_watching(self):
+        self._watching.clear()
+
+    def _watch(self, interval: float):
+        mtimes: Dict[str, float] = {}
+        while self._watching.is_set():
+            for module_name, module in list(self.modules.items()):
+                path = getattr(module, '__file__', None)
+                try:
+                    mtime = os.stat(path).st_mtime if path else None
+                except OSError:
+                    continue
+                if mtime is None:
+                    continue
+                if mtimes.setdefault(module_name, mtime) != mtime:
+                    mtimes[module_name] = mtime
+                    try:
+                        self.reload(module_name)
+                    except Exception as e:
+                        print(f"❌ Rechargement de {module_name} impossible : {e}")
+            time.sleep(interval)
+
+    def enable_admin_commands(self, owner_ids: List[str], category: str = "Admin", max_seconds: float = 300):
+        """
+        Register the built-in owner-only commands:
+            !profile [sample|cpu|memory] [secondes]  -> profiles the live process and replies with the file
+            !reload [module ...]                     -> reloads command modules (all of them by default)
+        """
+        owners = set(owner_ids)
+
+        def profile(message, args):
+            if message.author.id not in owners:
+                message.reply("⛔ Commande réservée aux propriétaires du bot.")
+                return
+            mode = args[0].lower() if args else 'sample'
+            try:
+                seconds = min(float(args[1]), max_seconds) if len(args) > 1 else 30.0
+            except ValueError:
+                message.reply(f"Usage : `{self.prefix}profile [{'|'.join(MODES)}] [secondes]`")
+                return
+
+            def done(path, summary):
+                message.reply(f"🔬 Profil `{mode}` terminé : `{path}`\n```\n{summary}\n```")
+
+            profiler = getattr(self.client, 'profiler', None) or Profiler(self.client)
+            try:
+                profiler.start(mode, seconds, done)
+            except (ValueError, ProfilerBusyError) as e:
+                message.reply(f"⚠️ {e}")
+                return
+            message.reply(f"🔬 Profilage `{mode}` lancé pour {seconds:.0f}s…")
+
+        def reload(message, args):
+            if message.author.id not in owners:
+                message.reply("⛔ Commande réservée aux propriétaires du bot.")
+                return
+            known = set(self.modules) | self._lazy_modules
+            for module_name in args or list(self.modules):
+                if module_name not in known:
+                    module_name = next((m for m in known if m.rsplit('.', 1)[-1] == module_name), module_name)
+                try:
+                    staged = self.reload(module_name)
+                except Exception as e:
+                    message.reply(f"❌ `{module_name}` : {e}")
+                    continue
+                message.reply(f"🔄 `{module_name}` rechargé ({len(staged)} commande(s))")
+
+        self.register_command(Command('profile', f"Profile le bot en direct ({', '.join(MODES)})", category, profile))
+        self.register_command(Command('reload', "Recharge des modules de commandes sans redémarrer", category, reload))
+
     async def handle_message(self, message):
         """Handle incoming messages and execute commands"""
         if message.author.id == self.client.user.id:
@@ -50,19 +247,52 @@ class CommandManager:
 
         if cmd_name in self.commands:
             command = self.commands[cmd_name]
+            if command.callback is None:
+                command = self._resolve_lazy(command)
+                if command is None:
+                    return
+            tracer = getattr(self.client, 'tracer', None)
+            span = tracer.start_span(cmd_name, 'command', args=len(args)) if tracer and tracer.enabled else None
+            start = time.perf_counter()
             try:
-                # Check if callback is async or sync
-                if inspect.iscoroutinefunction(command.callback):
-                    await command.callback(message, args)
+                await self._invoke(command.callback, message, args)
+            except CircuitOpenError as e:
+                self._command_errors.inc(command=cmd_name, error='circuit_open')
+                # Upstream known to be down: answer right away instead of waiting for a timeout
+                if command.fallback:
+                    await self._invoke_fallback(command, cmd_name, message, args)
                 else:
-                    command.callback(message, args)
+                    message.reply(f"⏳ Service temporairement indisponible, réessaie dans {int(e.retry_in) or 1}s.")
             except Exception as e:
+                self._command_errors.inc(command=cmd_name, error=type(e).__name__)
                 print(f"❌ Erreur commande {cmd_name}: {e}")
-                message.reply(f"❌ Une erreur est survenue : {str(e)}")
+                if command.fallback:
+                    await self._invoke_fallback(command, cmd_name, message, args)
+                else:
+                    message.reply(f"❌ Une erreur est survenue : {str(e)}")
+            finally:
+                command.timer.observe(time.perf_counter() - start)
+                if span:
+                    tracer.end_span(span)
         else:
             # Unknown command
             pass
 
+    async def _invoke(self, callback: Callable, message, args: List[str]):
+        """Call a command callback, whether it is async or sync"""
+        if inspect.iscoroutinefunction(callback):
+            await callback(message, args)
+        else:
+            callback(message, args)
+
+    async def _invoke_fallback(self, command: Command, cmd_name: str, message, args: List[str]):
+        """Run a command's fallback; its own errors are logged, never raised to the caller"""
+        try:
+            await self._invoke(command.fallback, message, args)
+        except Exception as e:
+            self._command_errors.inc(command=cmd_name, error='fallback')
+            print(f"❌ Erreur du fallback de {cmd_name}: {e}")
+
     def generate_help_embed(self) -> Embed:
         """Generate a dynamic help embed based on registered commands"""
         embed = Embed()
@@ -0,0 +1,531 @@
+"""
+In-process stand-in for the Velmu backend, for offline integration and load tests
+
+Implements the REST routes used by HTTPClient and the Socket.IO events the Client
+listens to, with in-memory state, configurable artificial latency and error injection.
+
+Example:
+    server = FakeVelmuServer(latency=(0.005, 0.02))
+    bot, token = server.add_user("MonBot", bot=True)
+    alice, _ = server.add_user("alice")
+    guild = server.add_server("Test", owner_id=alice['id'], members=[bot['id']])
+    channel = server.add_channel(guild['id'], "general")
+    server.start()
+
+    client = velmu.Client(base_url=server.url)
+    ...
+    server.post_message(alice['id'], channel['id'], "!ping")
+
+Run standalone with `python -m velmu.fake_server --port 4000`.
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import socketio
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, error: str):
+        super().__init__(error)
+        self.status = status
+        self.error = error
+
+
+def _route_name(method: str, pattern: str) -> str:
+    return f"{method} " + re.sub(r'\(\?P<(\w+)>[^)]*\)', r':\1', pattern)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class FakeVelmuServer:
+    """
+    Args:
+        host, port: Bind address (port 0 picks a free port)
+        latency: Extra delay per REST request, in seconds, or a (min, max) range
+        error_rate: Probability that a REST request fails with a 500
+        route_errors: Per-route error probabilities, e.g. {"POST /messages": 0.5,
+                      "POST /messages/:message_id/reactions": 0.1}
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: Any = 0.0,
+                 error_rate: float = 0.0, route_errors: Optional[Dict[str, float]] = None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.route_errors = route_errors or {}
+
+        self.users: Dict[str, dict] = {}
+        self.tokens: Dict[str, str] = {}
+        self.servers: Dict[str, dict] = {}
+        self.members: Dict[str, List[str]] = {}
+        self.channels: Dict[str, dict] = {}
+        self.messages: Dict[str, dict] = {}
+        self.channel_messages: Dict[str, List[str]] = {}
+        # (route, statut, durée) de chaque requête REST reçue
+        self.request_log: List[Tuple[str, int, float]] = []
+        # Callbacks (message) appelés pour chaque message créé, quel que soit l'auteur
+        self.message_listeners: List[Callable[[dict], None]] = []
+
+        self._lock = threading.RLock()
+        self._sessions: Dict[str, str] = {}
+        self._httpd = None
+        self._thread = None
+
+        # wsgiref ne sait pas céder sa socket à un WebSocket : on reste en long-polling
+        quiet = logging.getLogger('velmu.fake_server')
+        quiet.setLevel(logging.CRITICAL)
+        self.sio = socketio.Server(async_mode='threading', transports=['polling'],
+                                   logger=quiet, engineio_logger=quiet)
+        self.sio.on('connect', self._on_connect)
+        self.sio.on('disconnect', self._on_disconnect)
+        self.sio.on('join_channel', self._on_join_channel)
+        self.sio.on('leave_channel', self._on_leave_channel)
+        self.sio.on('join_server', self._on_join_server)
+        self.sio.on('leave_server', self._on_leave_server)
+        self.app = socketio.WSGIApp(self.sio, self._rest_app)
+
+        self._routes = [
+            ('GET', r'/users/me', self._get_me),
+            ('GET', r'/users/me/servers', self._get_my_servers),
+            ('GET', r'/messages', self._list_messages),
+            ('POST', r'/messages', self._create_message),
+            ('GET', r'/messages/(?P<message_id>[^/]+)', self._get_message),
+            ('PUT', r'/messages/(?P<message_id>[^/]+)', self._update_message),
+            ('DELETE', r'/messages/(?P<message_id>[^/]+)', self._delete_message),
+            ('POST', r'/messages/(?P<message_id>[^/]+)/reactions', self._add_reaction),
+            ('DELETE', r'/messages/(?P<message_id>[^/]+)/reactions/(?P<emoji>[^/]+)', self._remove_reaction),
+            ('GET', r'/channels/(?P<channel_id>[^/]+)', self._get_channel),
+            ('POST', r'/channels', self._create_channel),
+            ('DELETE', r'/channels/(?P<channel_id>[^/]+)', self._delete_channel),
+            ('GET', r'/servers/(?P<server_id>[^/]+)', self._get_server),
+            ('GET', r'/members/(?P<server_id>[^/]+)', self._get_members),
+            ('DELETE', r'/members/(?P<server_id>[^/]+)/kick/(?P<user_id>[^/]+)', self._kick_member),
+        ]
+        # (méthode, regex, nom lisible type "DELETE /messages/:message_id/reactions/:emoji", handler)
+        self._routes = [(method, re.compile(f'^/api{pattern}$'), _route_name(method, pattern), handler)
+                        for method, pattern, handler in self._routes]
+
+    # --- Cycle de vie ---
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'FakeVelmuServer':
+        """Start serving in a background thread"""
+        self._httpd = make_server(self.host, self.port, self.app,
+                                  server_class=_ThreadingWSGIServer, handler_class=_QuietHandler)
+        self.port = self._httpd.server_port
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fake-velmu', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Fixtures ---
+    def add_user(self, username: str, bot: bool = False, token: Optional[str] = None) -> Tuple[dict, str]:
+        """Create a user and return (user, token); `token` lets an existing bot token log in"""
+        user = {
+            'id': str(uuid.uuid4()),
+            'username': username,
+            'discriminator': f"{random.randint(0, 9999):04d}",
+            'isBot': bot,
+            'avatarUrl': None,
+            'createdAt': _now(),
+        }
+        token = token or f"fake.{uuid.uuid4().hex}"
+        with self._lock:
+            self.users[user['id']] = user
+            self.tokens[token] = user['id']
+        return user, token
+
+    def add_server(self, name: str, owner_id: str, members: Optional[List[str]] = None) -> dict:
+        server = {'id': str(uuid.uuid4()), 'name': name, 'ownerId': owner_id, 'iconUrl': None,
+                  'createdAt': _now()}
+        with self._lock:
+            self.servers[server['id']] = server
+            self.members[server['id']] = [owner_id]
+        for user_id in members or []:
+            self.add_member(server['id'], user_id, notify=False)
+        return server
+
+    def add_channel(self, server_id: str, name: str, type: str = 'TEXT') -> dict:
+        channel = {'id': str(uuid.uuid4()), 'name': name, 'type': type, 'serverId': server_id,
+                   'categoryId': None}
+        with self._lock:
+            self.channels[channel['id']] = channel
+            self.channel_messages[channel['id']] = []
+        return channel
+
+    def add_member(self, server_id: str, user_id: str, notify: bool = True) -> dict:
+        with self._lock:
+            if user_id not in self.members[server_id]:
+                self.members[server_id].append(user_id)
+        member = self._member_payload(server_id, user_id)
+        if notify:
+            self.sio.emit('member_added', member, room=f'server_{server_id}')
+        return member
+
+    def remove_member(self, server_id: str, user_id: str):
+        with self._lock:
+            if user_id in self.members.get(server_id, []):
+                self.members[server_id].remove(user_id)
+        self.sio.emit('member_removed', {'serverId': server_id, 'userId': user_id},
+                      room=f'server_{server_id}')
+
+    # --- Actions "utilisateur" (comme si un humain utilisait l'app) ---
+    def post_message(self, user_id: str, channel_id: str, content: str = None,
+                     reply_to_id: str = None, embed: dict = None) -> dict:
+        return self._store_message(user_id, channel_id, content, embed, reply_to_id)
+
+    def react(self, user_id: str, message_id: str, emoji: str) -> dict:
+        return self._store_reaction(user_id, message_id, emoji)
+
+    def unreact(self, user_id: str, message_id: str, emoji: str):
+        self._drop_reaction(user_id, message_id, emoji)
+
+    # --- Socket.IO ---
+    def _on_connect(self, sid, environ, auth=None):
+        token = (auth or {}).get('token')
+        user_id = self.tokens.get(token)
+        if not user_id:
+            raise socketio.exceptions.ConnectionRefusedError('Authentication error')
+        self._sessions[sid] = user_id
+        self.sio.enter_room(sid, f'user_{user_id}')
+        for server_id, member_ids in list(self.members.items()):
+            if user_id in member_ids:
+                self.sio.enter_room(sid, f'server_{server_id}')
+                if self.users[user_id]['isBot']:
+                    self.sio.enter_room(sid, f'server_{server_id}_bots')
+
+    def _on_disconnect(self, sid, *args):
+        self._sessions.pop(sid, None)
+
+    def _on_join_channel(self, sid, channel_id):
+        channel = self.channels.get(channel_id)
+        if channel and self._sessions.get(sid) in self.members.get(channel['serverId'], []):
+            self.sio.enter_room(sid, f'channel_{channel_id}')
+
+    def _on_leave_channel(self, sid, channel_id):
+        self.sio.leave_room(sid, f'channel_{channel_id}')
+
+    def _on_join_server(self, sid, server_id):
+        user_id = self._sessions.get(sid)
+        if user_id in self.members.get(server_id, []):
+            self.sio.enter_room(sid, f'server_{server_id}')
+            if self.users[user_id]['isBot']:
+                self.sio.enter_room(sid, f'server_{server_id}_bots')
+
+    def _on_leave_server(self, sid, server_id):
+        self.sio.leave_room(sid, f'server_{server_id}')
+        self.sio.leave_room(sid, f'server_{server_id}_bots')
+
+    # --- REST ---
+    def _rest_app(self, environ, start_response):
+        started = time.perf_counter()
+        method = environ['REQUEST_METHOD']
+        # wsgiref décode le chemin en latin-1 : on récupère l'UTF-8 (emojis)
+        path = environ.get('PATH_INFO', '').encode('latin-1').decode('utf-8', 'replace')
+        status, body = 404, {'error': 'Route introuvable'}
+        route = f"{method} {path}"
+
+        try:
+            self._simulate_latency()
+            for route_method, pattern, name, handler in self._routes:
+                match = pattern.match(path)
+                if match and route_method == method:
+                    route = name
+                    self._maybe_fail(route)
+                    user_id = self._authenticate(environ)
+                    request = {
+                        'user_id': user_id,
+                        'query': {k: v[0] for k, v in parse_qs(environ.get('QUERY_STRING', '')).items()},
+                        'json': self._read_json(environ),
+                    }
+                    params = {k: unquote(v) for k, v in match.groupdict().items()}
+                    status, body = handler(request, **params)
+                    break
+        except HTTPError as e:
+            status, body = e.status, {'error': e.error}
+        except Exception as e:
+            status, body = 500, {'error': str(e)}
+
+        self.request_log.append((route, status, time.perf_counter() - started))
+        payload = json.dumps(body).encode('utf-8')
+        start_response(f"{status} {'OK' if status < 400 else 'Error'}", [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(payload))),
+        ])
+        return [payload]
+
+    def _simulate_latency(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def _maybe_fail(self, route: str):
+        rate = self.route_errors.get(route, self.error_rate)
+        if rate and random.random() < rate:
+            raise HTTPError(500, 'Erreur injectée')
+
+    def _authenticate(self, environ) -> str:
+        header = environ.get('HTTP_AUTHORIZATION', '')
+        token = header.split(' ', 1)[1] if ' ' in header else ''
+        user_id = self.tokens.get(token)
+        if not user_id:
+            raise HTTPError(401, 'Token invalide')
+        return user_id
+
+    def _read_json(self, environ) -> dict:
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if not length:
+            return {}
+        try:
+            return json.loads(environ['wsgi.input'].read(length))
+        except ValueError:
+            raise HTTPError(400, 'JSON invalide')
+
+    # Users
+    def _get_me(self, request):
+        return 200, self.users[request['user_id']]
+
+    def _get_my_servers(self, request):
+        with self._lock:
+            return 200, [s for sid, s in self.servers.items() if request['user_id'] in self.members[sid]]
+
+    # Messages
+    def _list_messages(self, request):
+        query = request['query']
+        channel_id = query.get('channelId')
+        if not channel_id:
+            raise HTTPError(400, 'channelId or conversationId is required')
+        limit = int(query.get('limit', 50))
+        cursor = query.get('cursor')
+        with self._lock:
+            ids = list(reversed(self.channel_messages.get(channel_id, [])))
+        if cursor:
+            # Comme Prisma : on part du curseur et on le saute (messages plus anciens)
+            ids = ids[ids.index(cursor) + 1:] if cursor in ids else []
+        return 200, [self.messages[i] for i in ids[:limit]]
+
+    def _create_message(self, request):
+        data = request['json']
+        channel_id = data.get('channelId')
+        if channel_id not in self.channels:
+            raise HTTPError(404, 'Salon introuvable')
+        content = data.get('content')
+        if content and len(content) > 2000:
+            raise HTTPError(400, 'Le message ne peut pas dépasser 2000 caractères')
+        message = self._store_message(request['user_id'], channel_id, content,
+                                      data.get('embed'), data.get('replyToId'))
+        return 201, message
+
+    def _get_message(self, request, message_id):
+        return 200, self._find_message(message_id)
+
+    def _update_message(self, request, message_id):
+        message = self._find_message(message_id)
+        if message['userId'] != request['user_id']:
+            raise HTTPError(403, 'Vous ne pouvez modifier que vos propres messages')
+        content = request['json'].get('content') or ''
+        if not content or len(content) > 2000:
+            raise HTTPError(400, 'Contenu invalide')
+        message['content'] = content
+        message['isEdited'] = True
+        message['updatedAt'] = _now()
+        self.sio.emit('message_updated', message, room=f"channel_{message['channelId']}")
+        return 200, message
+
+    def _delete_message(self, request, message_id):
+        message = self._find_message(message_id)
+        if message['userId'] != request['user_id']:
+            raise HTTPError(403, 'Accès refusé')
+        with self._lock:
+            self.messages.pop(message_id, None)
+            ids = self.channel_messages.get(message['channelId'], [])
+            if message_id in ids:
+                ids.remove(message_id)
+        self.sio.emit('message_deleted', {'id': message_id, 'channelId': message['channelId']},
+                      room=f"channel_{message['channelId']}")
+        return 200, {'success': True}
+
+    # Reactions
+    def _add_reaction(self, request, message_id):
+        emoji = request['json'].get('emoji')
+        if not emoji:
+            raise HTTPError(400, 'Emoji requis')
+        return 201, self._store_reaction(request['user_id'], message_id, emoji)
+
+    def _remove_reaction(self, request, message_id, emoji):
+        self._drop_reaction(request['user_id'], message_id, emoji)
+        return 200, {'success': True}
+
+    # Channels / servers / members
+    def _get_channel(self, request, channel_id):
+        channel = self.channels.get(channel_id)
+        if not channel:
+            raise HTTPError(404, 'Salon introuvable')
+        return 200, channel
+
+    def _create_channel(self, request):
+        data = request['json']
+        if data.get('serverId') not in self.servers:
+            raise HTTPError(404, 'Serveur introuvable')
+        return 201, self.add_channel(data['serverId'], data.get('name', 'nouveau-salon'), data.get('type', 'TEXT'))
+
+    def _delete_channel(self, request, channel_id):
+        with self._lock:
+            if self.channels.pop(channel_id, None) is None:
+                raise HTTPError(404, 'Salon introuvable')
+            for message_id in self.channel_messages.pop(channel_id, []):
+                self.messages.pop(message_id, None)
+        return 200, {'success': True}
+
+    def _get_server(self, request, server_id):
+        server = self.servers.get(server_id)
+        if not server:
+            raise HTTPError(404, 'Serveur introuvable')
+        return 200, server
+
+    def _get_members(self, request, server_id):
+        if server_id not in self.servers:
+            raise HTTPError(404, 'Serveur introuvable')
+        return 200, [self._member_payload(server_id, user_id) for user_id in list(self.members[server_id])]
+
+    def _kick_member(self, request, server_id, user_id):
+        if self.servers.get(server_id, {}).get('ownerId') != request['user_id']:
+            raise HTTPError(403, 'Permission refusée')
+        self.remove_member(server_id, user_id)
+        return 200, {'success': True}
+
+    # --- État interne ---
+    def _find_message(self, message_id: str) -> dict:
+        message = self.messages.get(message_id)
+        if not message:
+            raise HTTPError(404, 'Message introuvable')
+        return message
+
+    def _member_payload(self, server_id: str, user_id: str) -> dict:
+        return {'serverId': server_id, 'userId': user_id, 'user': self._user_payload(user_id)}
+
+    def _user_payload(self, user_id: str) -> dict:
+        user = self.users[user_id]
+        return {k: user[k] for k in ('id', 'username', 'discriminator', 'avatarUrl', 'isBot')}
+
+    def _store_message(self, user_id, channel_id, content, embed, reply_to_id) -> dict:
+        channel = self.channels[channel_id]
+        message = {
+            'id': str(uuid.uuid4()),
+            'content': content or '',
+            'embed': embed,
+            'channelId': channel_id,
+            'serverId': channel['serverId'],
+            'userId': user_id,
+            'user': self._user_payload(user_id),
+            'replyToId': reply_to_id,
+            'replyTo': None,
+            'attachments': [],
+            'reactions': [],
+            'createdAt': _now(),
+            'isEdited': False,
+        }
+        if reply_to_id and reply_to_id in self.messages:
+            replied = self.messages[reply_to_id]
+            message['replyTo'] = {k: replied[k] for k in ('id', 'content', 'userId', 'user', 'channelId')}
+        with self._lock:
+            self.messages[message['id']] = message
+            self.channel_messages[channel_id].append(message['id'])
+
+        self.sio.emit('new_message', message, room=f'channel_{channel_id}')
+        self.sio.emit('new_message', message, room=f"server_{channel['serverId']}_bots")
+        for listener in list(self.message_listeners):
+            listener(message)
+        return message
+
+    def _store_reaction(self, user_id, message_id, emoji) -> dict:
+        message = self._find_message(message_id)
+        reaction = {'id': str(uuid.uuid4()), 'messageId': message_id, 'userId': user_id,
+                    'emoji': emoji, 'createdAt': _now()}
+        with self._lock:
+            message['reactions'].append(reaction)
+        payload = {'messageId': message_id, 'reaction': reaction}
+        self.sio.emit('message_reaction_add', payload, room=f"channel_{message['channelId']}")
+        self.sio.emit('message_reaction_add', payload, room=f"server_{message['serverId']}_bots")
+        return reaction
+
+    def _drop_reaction(self, user_id, message_id, emoji):
+        message = self._find_message(message_id)
+        with self._lock:
+            message['reactions'] = [r for r in message['reactions']
+                                    if not (r['userId'] == user_id and r['emoji'] == emoji)]
+        payload = {'messageId': message_id, 'userId': user_id, 'emoji': emoji}
+        self.sio.emit('message_reaction_remove', payload, room=f"channel_{message['channelId']}")
+        self.sio.emit('message_reaction_remove', payload, room=f"server_{message['serverId']}_bots")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serveur Velmu factice (tests hors ligne)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence ajoutée par requête REST (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probabilité d'erreur 500 par requête")
+    args = parser.parse_args()
+
+    server = FakeVelmuServer(args.host, args.port, latency=args.latency, error_rate=args.error_rate)
+    bot, token = server.add_user('Bot', bot=True)
+    human, _ = server.add_user('alice')
+    guild = server.add_server('Serveur de test', owner_id=human['id'], members=[bot['id']])
+    channel = server.add_channel(guild['id'], 'general')
+    server.start()
+
+    print(f"🧪 Serveur factice sur {server.url}")
+    print(f"   Token du bot : {token}")
+    print(f"   Salon : {channel['id']}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Bounded in-memory conversation history, per channel
+"""
+
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Deque, List
+
+
+class HistoryStore:
+    """
+    Keeps the last lines of conversation for each channel, with hard memory bounds.
+
+    - each channel holds at most `max_lines` lines (fixed-size deque, no re-allocation)
+    - at most `max_channels` channels are kept; the least recently used one is evicted
+    - the total number of stored characters never exceeds `max_chars`
+
+    Example:
+        history = HistoryStore(max_lines=40)
+        history.append(channel_id, "alice: salut")
+        prompt_lines = history.recent(channel_id, 10)
+    """
+
+    def __init__(self, max_lines: int = 40, max_channels: int = 1000, max_chars: int = 2_000_000):
+        self.max_lines = max_lines
+        self.max_channels = max_channels
+        self.max_chars = max_chars
+        self._channels: "OrderedDict[str, Deque[str]]" = OrderedDict()
+        self.total_chars = 0
+
+    def append(self, channel_id, line: str):
+        """Add a line to a channel, evicting old lines / channels if needed"""
+        key = str(channel_id)
+        lines = self._channels.get(key)
+        if lines is None:
+            lines = self._channels[key] = deque(maxlen=self.max_lines)
+        else:
+            self._channels.move_to_end(key)
+
+        if len(lines) == self.max_lines:
+            # The deque drops its oldest line on append
+            self.total_chars -= len(lines[0])
+        lines.append(line)
+        self.total_chars += len(line)
+
+        self._evict(keep=key)
+
+    def recent(self, channel_id, n: int) -> List[str]:
+        """The last `n` lines of a channel, oldest first (cost depends on `n` only)"""
+        lines = self._channels.get(str(channel_id))
+        if not lines:
+            return []
+        tail = list(islice(reversed(lines), n))
+        tail.reverse()
+        return tail
+
+    def clear(self, channel_id):
+        lines = self._channels.pop(str(channel_id), None)
+        if lines:
+            self.total_chars -= sum(len(line) for line in lines)
+
+    def _evict(self, keep: str):
+        while len(self._channels) > self.max_channels or self.total_chars > self.max_chars:
+            oldest = next(iter(self._channels))
+            if oldest == keep:
+                # Only the active channel is left: trim its own oldest lines instead
+                lines = self._channels[keep]
+                if len(lines) <= 1:
+                    break
+                self.total_chars -= len(lines.popleft())
+                continue
+            self.clear(oldest)
+
+    def __contains__(self, channel_id) -> bool:
+        return str(channel_id) in self._channels
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def __repr__(self) -> str:
+        return f"<HistoryStore channels={len(self._channels)} chars={self.total_chars}>"
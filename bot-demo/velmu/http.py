@@ -1,18 +1,82 @@
-import requests
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from .breaker import CircuitBreaker, OPEN, HALF_OPEN
+from .metrics import MetricsRegistry
+from .tracing import Tracer
+
+# Segments variables d'une route (ids, emojis...) remplacés par ":id" dans les métriques
+_ROUTE_PARAM = re.compile(r'/(?![a-z_-]+(?:/|$))[^/]+')
+
+
+def route_template(endpoint):
+    """'/messages/3f2a.../reactions/👍?x=1' -> '/messages/:id/reactions/:id'"""
+    return _ROUTE_PARAM.sub('/:id', endpoint.split('?', 1)[0])
+
 
 class HTTPClient:
-    def __init__(self, token, api_url='http://localhost:4000/api'):
+    def __init__(self, token, api_url='http://localhost:4000/api', metrics=None, tracer=None, session=None,
+                 executor=None):
         self.token = token
+        # Pool de connexions keep-alive (partageable entre plusieurs bots, voir BotRunner)
+        if session is None:
+            import requests  # différé : `import velmu` ne charge pas requests
+            session = requests.Session()
+        self.session = session
         self.api_url = api_url
         self.headers = {
             'Authorization': f'Bot {token}',
             'Content-Type': 'application/json'
         }
+        # Un circuit breaker par API externe (clé = hôte)
+        self.breakers = {}
+
+        # Appels REST lancés en arrière-plan (réactions multiples...) et espacement minimal des réactions
+        self._background = executor
+        self._background_lock = threading.Lock()
+        self.reaction_interval = 0.05
+        self._next_reaction = 0.0
+        self._reaction_lock = threading.Lock()
+
+        # Fusion des messages texte par salon (send_message(coalesce=True), voir velmu.outbox)
+        self.coalesce_window = 0.25
+        self._outbox = None
+        self._outbox_lock = threading.Lock()
+
+        self.tracer = tracer or Tracer()
+        self.metrics = metrics or MetricsRegistry()
+        self._request_seconds = self.metrics.histogram(
+            'velmu_http_request_duration_seconds', "Durée des requêtes REST par route", ('method', 'route'))
+        self._responses = self.metrics.counter(
+            'velmu_http_responses_total', "Réponses REST par route et code HTTP", ('method', 'route', 'status'))
+        self.metrics.gauge('velmu_breaker_state', "État des circuit breakers (0 fermé, 1 semi-ouvert, 2 ouvert)",
+                           ('upstream',), func=self._breaker_states)
+        self.metrics.gauge('velmu_breaker_error_rate', "Taux d'erreur des API externes sur la fenêtre glissante",
+                           ('upstream',), func=self._breaker_error_rates)
 
     def request(self, method, endpoint, **kwargs):
         url = f"{self.api_url}{endpoint}"
-        response = requests.request(method, url, headers=self.headers, **kwargs)
-        
+        route = route_template(endpoint)
+        span = self.tracer.start_span(f"{method} {route}", 'request', hook='on_request_start',
+                                      method=method, endpoint=endpoint) if self.tracer.enabled else None
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=self.headers, **kwargs)
+        except Exception as e:
+            self._responses.inc(method=method, route=route, status='error')
+            if span:
+                self.tracer.end_span(span, hook='on_request_end', error=e)
+            raise
+        finally:
+            self._request_seconds.observe(time.perf_counter() - start, method=method, route=route)
+        self._responses.inc(method=method, route=route, status=response.status_code)
+        if span:
+            span.set_attribute('status', response.status_code)
+            self.tracer.end_span(span, hook='on_request_end')
+
         if response.status_code == 403:
             try:
                 error_msg = response.json().get('error', 'Permission denied')
@@ -27,7 +91,7 @@ class HTTPClient:
         except:
             return response.text
 
-    def send_message(self, channel_id, content=None, embed=None, reply_to_id=None):
+    def send_message(self, channel_id, content=None, embed=None, reply_to_id=None, coalesce=False):
         """
         Send a message to a channel
         Args:
@@ -35,7 +99,33 @@ class HTTPClient:
             content: Text content (optional if embed is provided)
             embed: Embed object (optional)
             reply_to_id: ID of the message to reply to (optional)
+            coalesce: merge this plain-text message with the others queued for the channel
+                      during `coalesce_window` seconds (see velmu.outbox); returns a Future
+                      instead of the API response. Ignored for embeds and replies.
         """
+        if coalesce and content and not embed and not reply_to_id:
+            return self.outbox.send(channel_id, content)
+        if self._outbox is None:
+            return self._post_message(channel_id, content, embed, reply_to_id)
+        # Après les messages en attente de ce salon : jamais de réordonnancement
+        return self._outbox.send_now(channel_id, lambda: self._post_message(channel_id, content, embed, reply_to_id))
+
+    @property
+    def outbox(self):
+        """Per-channel coalescing queue, created on the first `coalesce=True` send"""
+        if self._outbox is None:
+            with self._outbox_lock:
+                if self._outbox is None:
+                    from .outbox import SendQueue
+                    self._outbox = SendQueue(self, window=self.coalesce_window)
+        return self._outbox
+
+    def flush_messages(self):
+        """Send the coalesced messages still waiting, right now"""
+        if self._outbox is not None:
+            self._outbox.flush()
+
+    def _post_message(self, channel_id, content=None, embed=None, reply_to_id=None):
         payload = {'channelId': channel_id}
         
         if content:
@@ -77,8 +167,12 @@ class HTTPClient:
     def get_message(self, message_id):
         return self.request('GET', f'/messages/{message_id}')
 
-    def get_channel_messages(self, channel_id, limit=50):
-        return self.request('GET', f'/messages?channelId={channel_id}&limit={limit}')
+    def get_channel_messages(self, channel_id, limit=50, cursor=None):
+        """Messages du plus récent au plus ancien ; `cursor` = ID du dernier message de la page précédente."""
+        endpoint = f'/messages?channelId={channel_id}&limit={limit}'
+        if cursor:
+            endpoint += f'&cursor={cursor}'
+        return self.request('GET', endpoint)
 
     # --- Servers ---
     def get_server(self, server_id):
@@ -104,14 +198,96 @@ class HTTPClient:
     def add_reaction(self, message_id, emoji):
         return self.request('POST', f'/messages/{message_id}/reactions', json={'emoji': emoji})
 
+    def add_reactions(self, message_id, emojis):
+        """
+        Ajoute plusieurs réactions sans bloquer l'appelant ; retourne un Future.
+        Les réactions d'un même message partent l'une après l'autre, et non en parallèle :
+        le backend les affiche dans leur ordre d'arrivée, donc des POST concurrents
+        mélangeraient l'ordre voulu (pfc : 🪨 📄 ✂️). Le gain vient de l'appelant, qui
+        n'attend plus ; les réactions de messages différents partent en parallèle. Tous les
+        appels sont espacés d'au moins `reaction_interval` secondes (limite de débit).
+        """
+        def send_all():
+            results = []
+            for emoji in emojis:
+                self._wait_reaction_slot()
+                try:
+                    results.append(self.add_reaction(message_id, emoji))
+                except Exception as e:
+                    # Le Future est souvent ignoré (pfc_bot) : l'échec doit au moins apparaître dans les logs
+                    print(f"❌ Réaction {emoji} impossible sur {message_id} ({len(results)}/{len(emojis)} ajoutée(s)) : {e}")
+                    raise
+            return results
+        return self.submit(send_all)
+
+    def _wait_reaction_slot(self):
+        with self._reaction_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_reaction)
+            self._next_reaction = slot + self.reaction_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def submit(self, func, *args, **kwargs):
+        """Exécute `func` sur le pool d'arrière-plan du client (contexte de traçage conservé)."""
+        if self._background is None:
+            with self._background_lock:
+                if self._background is None:
+                    self._background = ThreadPoolExecutor(max_workers=4, thread_name_prefix='velmu-http')
+        context = contextvars.copy_context()
+        return self._background.submit(context.run, func, *args, **kwargs)
+
     def remove_reaction(self, message_id, emoji, user_id=None):
         return self.request('DELETE', f'/messages/{message_id}/reactions/{emoji}')
 
     # --- Edits ---
     def edit_message(self, message_id, content):
+        # Le backend (PUT /messages/:id) ne modifie que le texte, pas l'embed
         return self.request('PUT', f'/messages/{message_id}', json={'content': content})
 
     # --- Moderation ---
     def ban_user(self, server_id, user_id):
         # Route hypothétique, à adapter si elle existe
         return self.request('POST', f'/members/{server_id}/ban', json={'userId': user_id})
+
+    # --- APIs externes ---
+    def get_breaker(self, upstream):
+        """Retourne (ou crée) le circuit breaker associé à une API externe."""
+        breaker = self.breakers.get(upstream)
+        if breaker is None:
+            breaker = self.breakers.setdefault(upstream, CircuitBreaker(upstream))
+        return breaker
+
+    def external_request(self, method, url, upstream=None, timeout=5, **kwargs):
+        """
+        Appelle une API tierce à travers son circuit breaker.
+        Lève CircuitOpenError immédiatement si l'API est considérée hors service,
+        et compte les erreurs réseau / 5xx / 429 comme des échecs.
+        """
+        breaker = self.get_breaker(upstream or urlparse(url).netloc)
+        breaker.before_call()
+        try:
+            response = self.session.request(method, url, timeout=timeout, **kwargs)
+        except Exception:
+            breaker.record_failure()
+            raise
+
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def get_external(self, url, **kwargs):
+        return self.external_request('GET', url, **kwargs)
+
+    def breaker_metrics(self):
+        """État et taux d'erreur de chaque API externe."""
+        return {name: breaker.metrics() for name, breaker in list(self.breakers.items())}
+
+    def _breaker_states(self):
+        levels = {OPEN: 2, HALF_OPEN: 1}
+        return {(name,): levels.get(breaker.state, 0) for name, breaker in list(self.breakers.items())}
+
+    def _breaker_error_rates(self):
+        return {(name,): breaker.error_rate() for name, breaker in list(self.breakers.items())}
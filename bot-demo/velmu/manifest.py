@@ -0,0 +1,124 @@
+"""
+Command manifest: what each command module registers, without importing it
+
+The manifest is built by reading the `@manager.command(...)` decorators of every
+module in a commands package with `ast`, so no module (and none of its imports)
+runs. CommandManager.load_manifest() registers placeholders from it, so `!help`
+lists everything, and imports a module the first time one of its commands is used.
+
+Each entry keeps the sha1 of its source: an out-of-date entry is parsed again at
+startup instead of being trusted.
+
+Example:
+    python -m velmu.manifest commands        # writes commands/manifest.json
+
+    manager.load_manifest('commands/manifest.json')
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 1
+DEFAULT_DESCRIPTION = "Pas de description"
+DEFAULT_CATEGORY = "Général"
+_FIELDS = ('name', 'description', 'category')
+
+
+def _literal(node) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def scan_source(source: str) -> Optional[List[dict]]:
+    """
+    Commands declared with `@<manager>.command(...)` in `source`, or None when they
+    cannot all be read statically (computed names, register_command calls...):
+    such a module has to be imported at startup.
+    """
+    tree = ast.parse(source)
+    commands = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+                and node.func.attr == 'register_command':
+            return None
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)
+                    and decorator.func.attr == 'command'):
+                continue
+            entry = {'name': node.name, 'description': DEFAULT_DESCRIPTION, 'category': DEFAULT_CATEGORY}
+            values = list(zip(_FIELDS, decorator.args)) + [(kw.arg, kw.value) for kw in decorator.keywords]
+            for field, value in values:
+                if field not in _FIELDS:
+                    continue
+                if _literal(value) is None:
+                    return None
+                entry[field] = _literal(value)
+            commands.append(entry)
+    return commands or None
+
+
+def _sha1(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def scan_module(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    return {'sha1': hashlib.sha1(source.encode('utf-8')).hexdigest(), 'commands': scan_source(source)}
+
+
+def build_manifest(directory: str, package: Optional[str] = None) -> dict:
+    """Manifest of every `*.py` module of `directory` (imported as `package.<module>`)"""
+    package = package or os.path.basename(os.path.normpath(directory))
+    modules = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.py') and not filename.startswith('__'):
+            modules[f"{package}.{filename[:-3]}"] = scan_module(os.path.join(directory, filename))
+    return {'version': MANIFEST_VERSION, 'package': package, 'modules': modules}
+
+
+def write_manifest(directory: str, path: Optional[str] = None, package: Optional[str] = None) -> str:
+    path = path or os.path.join(directory, 'manifest.json')
+    manifest = build_manifest(directory, package)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    return path
+
+
+def read_manifest(path: str) -> Dict[str, Optional[List[dict]]]:
+    """
+    module name -> commands (None = import at startup), refreshed from the source
+    of modules that changed or appeared since the manifest was written.
+    """
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Version de manifeste non supportée : {manifest.get('version')}")
+    directory = os.path.dirname(os.path.abspath(path))
+    package = manifest.get('package') or os.path.basename(directory)
+    entries = manifest.get('modules', {})
+
+    modules = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.py') or filename.startswith('__'):
+            continue
+        module_name = f"{package}.{filename[:-3]}"
+        source = os.path.join(directory, filename)
+        entry = entries.get(module_name)
+        if entry is None or entry.get('sha1') != _sha1(source):
+            entry = scan_module(source)
+        modules[module_name] = entry['commands']
+    return modules
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit("Usage : python -m velmu.manifest <dossier des commandes> [manifest.json]")
+    print(f"📝 Manifeste écrit : {write_manifest(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)}")
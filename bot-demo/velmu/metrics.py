@@ -0,0 +1,280 @@
+"""
+Lightweight in-process metrics (counters, gauges, histograms)
+
+Exposed programmatically (`registry.snapshot()`) and as Prometheus-style text over
+a local HTTP port (`registry.serve(9100)`), without any external dependency.
+
+Example:
+    client.metrics.serve(9100)           # curl localhost:9100/metrics
+    client.metrics.snapshot()['velmu_command_duration_seconds']
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _format_labels(self, key: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        inner = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+        return '{' + inner + '}'
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    type = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(self.name + self._format_labels(k), v) for k, v in self._values.items()]
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down. `func` makes it computed at read time: it returns
+    either a number or a {label values tuple: number} dict.
+    """
+    type = 'gauge'
+
+    def __init__(self, name, help, labelnames=(), func: Optional[Callable[[], Any]] = None):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._func = func
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        if self._func is not None:
+            value = self._func()
+            return dict(value) if isinstance(value, dict) else {(): value}
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> List[Tuple[str, float]]:
+        return [(self.name + self._format_labels(k), v) for k, v in self.snapshot().items()]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (durations in seconds) over fixed buckets"""
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _Series] = {}
+
+    def observe(self, value: float, **labels):
+        self.labels(**labels).observe(value)
+
+    def labels(self, **labels) -> '_Series':
+        """Series bound to fixed label values; cache it on hot paths to skip the label lookup"""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, _Series(self.buckets))
+        return series
+
+    def _folded(self) -> List[Tuple[LabelValues, List[int], float, int]]:
+        with self._lock:
+            items = list(self._series.items())
+        result = []
+        for key, series in items:
+            series.fold()
+            result.append((key, list(series.counts), series.sum, series.count))
+        return result
+
+    def snapshot(self) -> Dict[LabelValues, Dict[str, Any]]:
+        result = {}
+        for key, counts, total, count in self._folded():
+            result[key] = {
+                'count': count,
+                'sum': total,
+                'avg': total / count if count else 0.0,
+                'p50': self._quantile(counts, count, 0.50),
+                'p95': self._quantile(counts, count, 0.95),
+                'p99': self._quantile(counts, count, 0.99),
+            }
+        return result
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile"""
+        if not count:
+            return 0.0
+        target = q * count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return float('inf')
+
+    def samples(self) -> List[Tuple[str, float]]:
+        lines = []
+        for key, counts, total, count in self._folded():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append((f"{self.name}_bucket{self._format_labels(key, [('le', le)])}", cumulative))
+            lines.append((f"{self.name}_sum{self._format_labels(key)}", total))
+            lines.append((f"{self.name}_count{self._format_labels(key)}", count))
+        return lines
+
+
+class _Series:
+    """
+    One labelled histogram series. observe() only appends to a deque (atomic, no
+    lock) so timing a hot path stays cheap; values are folded into the buckets
+    when the series is read, or once too many are pending.
+    """
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_pending', '_lock')
+
+    MAX_PENDING = 4096
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._pending: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        self._pending.append(value)
+        if len(self._pending) > self.MAX_PENDING:
+            self.fold()
+
+    def fold(self):
+        pending = self._pending
+        with self._lock:
+            while pending:
+                try:
+                    value = pending.popleft()
+                except IndexError:
+                    break
+                self.counts[bisect.bisect_left(self.buckets, value)] += 1
+                self.sum += value
+                self.count += 1
+
+
+class MetricsRegistry:
+    """Holds the metrics of a client (or of several clients sharing it)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._server: Optional['ThreadingHTTPServer'] = None
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str = '', labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str = '', labelnames: Sequence[str] = (),
+              func: Optional[Callable[[], Any]] = None) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames, func=func)
+
+    def histogram(self, name: str, help: str = '', labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[LabelValues, Any]]:
+        """All current values, keyed by metric name then by label values"""
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for sample, value in metric.samples():
+                lines.append(f"{sample} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 9100, host: str = '127.0.0.1') -> 'ThreadingHTTPServer':
+        """Expose `render()` on http://host:port/metrics from a background thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='velmu-metrics', daemon=True).start()
+        print(f"📈 Métriques disponibles sur http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
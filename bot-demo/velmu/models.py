@@ -1,3 +1,6 @@
+from .streaming import stream_reply
+from .pagination import MessageIterator
+
 class User:
     def __init__(self, data, http=None):
         self.id = data.get('id')
@@ -55,9 +58,12 @@ class Channel:
         self.server_id = data.get('serverId')
         self._http = http
 
-    def send(self, content=None, embed=None):
-        """Envoie un message dans le salon."""
-        return self._http.send_message(self.id, content, embed)
+    def send(self, content=None, embed=None, coalesce=False):
+        """
+        Envoie un message dans le salon. Avec coalesce=True, un texte simple peut être
+        fusionné avec les autres envoyés au salon dans la même fenêtre (voir velmu.outbox).
+        """
+        return self._http.send_message(self.id, content, embed, coalesce=coalesce)
 
     def fetch_message(self, message_id):
         """Récupère un message spécifique."""
@@ -67,11 +73,16 @@ class Channel:
         return None
 
     def history(self, limit=50):
-        """Récupère l'historique des messages."""
-        data = self._http.get_channel_messages(self.id, limit)
-        if isinstance(data, list):
-            return [Message(msg_data, self._http) for msg_data in data]
-        return []
+        """Récupère l'historique des messages (liste, du plus récent au plus ancien)."""
+        return list(self.history_iter(limit=limit, page_size=limit or 50))
+
+    def history_iter(self, limit=50, page_size=50, prefetch=False):
+        """
+        Parcourt l'historique du plus récent au plus ancien, page par page à la demande
+        (`for` ou `async for`, voir velmu.pagination). limit=None pour tout le salon.
+        """
+        return MessageIterator(self._http, self.id, lambda data: Message(data, self._http),
+                               limit=limit, page_size=page_size, prefetch=prefetch)
 
     def __str__(self):
         return self.name
@@ -93,6 +104,8 @@ class Message:
         self.server_id = data.get('serverId')
         self.created_at = data.get('createdAt')
         self.reply_to_id = data.get('replyToId')
+        # True si le message a été manqué pendant une déconnexion puis rattrapé à la reconnexion
+        self.backfilled = False
         self._http = http
         
         self.channel = Channel({'id': self.channel_id, 'serverId': self.server_id}, http)
@@ -116,6 +129,13 @@ class Message:
         # Pour l'instant, on fait un send simple comme avant, mais on pourrait ajouter reply_to_id
         return self._http.send_message(self.channel_id, content, embed, reply_to_id=self.id)
 
+    async def stream_reply(self, chunks, **kwargs):
+        """
+        Répond avec un message édité progressivement au fil de la génération
+        (voir velmu.streaming.StreamingReply). Retourne le texte complet.
+        """
+        return await stream_reply(self._http, self.channel_id, chunks, reply_to_id=self.id, **kwargs)
+
     def delete(self):
         """Supprime le message."""
         return self._http.delete_message(self.id)
@@ -128,6 +148,10 @@ class Message:
         """Ajoute une réaction."""
         return self._http.add_reaction(self.id, emoji)
 
+    def add_reactions(self, emojis):
+        """Ajoute plusieurs réactions dans l'ordre (séquentiellement), en arrière-plan (retourne un Future)."""
+        return self._http.add_reactions(self.id, list(emojis))
+
     def remove_reaction(self, emoji, user_id=None):
         """Retire une réaction."""
         return self._http.remove_reaction(self.id, emoji, user_id)
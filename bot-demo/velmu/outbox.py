@@ -0,0 +1,152 @@
+"""
+Opt-in coalescing of outgoing messages, per channel
+
+Plain-text messages sent with `coalesce=True` wait `window` seconds in a
+per-channel buffer; everything queued for that channel meanwhile goes out as one
+message (joined by `separator`), as long as it fits in the backend's 2000
+characters. Order is preserved: any other message to the channel (reply, embed,
+regular send) first flushes the buffer, and replies are never merged.
+
+Example (burst of welcomes during a raid):
+    channel.send(f"🎉 Bienvenue **{username}** !", coalesce=True)
+    # -> one POST /messages per window instead of one per member
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .streaming import MAX_MESSAGE_LENGTH
+
+
+def message_length(text: str) -> int:
+    """Length as the backend validates it (JavaScript string: UTF-16 code units)"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+class _ChannelBuffer:
+    def __init__(self):
+        self.parts: List[Tuple[str, Future]] = []
+        self.length = 0
+        self.timer: Optional[threading.Timer] = None
+        self.lock = threading.Lock()
+        # Held while a batch is taken and posted: batches of a channel leave in order
+        self.send_lock = threading.Lock()
+
+
+class SendQueue:
+    """
+    Per-channel buffers in front of HTTPClient.send_message.
+
+    Args:
+        window: seconds a message may wait for others to join it
+        max_length: maximum length of a merged message
+        separator: inserted between merged messages
+    """
+
+    def __init__(self, http, window: float = 0.25, max_length: int = MAX_MESSAGE_LENGTH, separator: str = '\n'):
+        self._http = http
+        self.window = window
+        self.max_length = max_length
+        self.separator = separator
+        self._buffers: Dict[str, _ChannelBuffer] = {}
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.sent = 0
+
+    def _buffer(self, channel_id) -> _ChannelBuffer:
+        buffer = self._buffers.get(channel_id)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(channel_id, _ChannelBuffer())
+        return buffer
+
+    def send(self, channel_id, content: str) -> Future:
+        """
+        Queue `content` for `channel_id`. The Future resolves to the API response of
+        the message it ended up in (shared by every merged part).
+        """
+        future = Future()
+        buffer = self._buffer(channel_id)
+        length = message_length(content)
+        if length > self.max_length:
+            # Trop long pour être fusionné : envoyé seul, après ce qui attend déjà
+            with buffer.send_lock:
+                self._drain(channel_id, buffer)
+                self._post(channel_id, [(content, future)])
+            return future
+
+        sep = message_length(self.separator)
+        while True:
+            with buffer.lock:
+                if self._buffers.get(channel_id) is not buffer:
+                    # Buffer vide retiré entre-temps (voir _discard_if_empty) : on en prend un neuf
+                    buffer = self._buffer(channel_id)
+                    continue
+                if not buffer.parts or buffer.length + sep + length <= self.max_length:
+                    buffer.length += (sep if buffer.parts else 0) + length
+                    buffer.parts.append((content, future))
+                    self.queued += 1
+                    if buffer.timer is None:
+                        buffer.timer = threading.Timer(self.window, self.flush, args=(channel_id,))
+                        buffer.timer.daemon = True
+                        buffer.timer.start()
+                    return future
+            # Le prochain morceau dépasserait la limite : on envoie ce qui attend, puis on réessaie
+            self.flush(channel_id)
+
+    def flush(self, channel_id=None):
+        """Send what is waiting for `channel_id` (every channel if None) right now"""
+        if channel_id is None:
+            for pending in list(self._buffers):
+                self.flush(pending)
+            return
+        buffer = self._buffers.get(channel_id)
+        if buffer is None or not buffer.parts:
+            return
+        with buffer.send_lock:
+            self._drain(channel_id, buffer)
+
+    def send_now(self, channel_id, post: Callable[[], Any]):
+        """Call `post()` (an unmerged send) once what is waiting for the channel is sent"""
+        buffer = self._buffers.get(channel_id)
+        if buffer is None:
+            return post()
+        with buffer.send_lock:
+            self._drain(channel_id, buffer)
+            return post()
+
+    def _drain(self, channel_id, buffer: _ChannelBuffer):
+        """Post the waiting batch (caller holds buffer.send_lock)"""
+        with buffer.lock:
+            parts, buffer.parts, buffer.length = buffer.parts, [], 0
+            if buffer.timer is not None:
+                buffer.timer.cancel()
+                buffer.timer = None
+        if parts:
+            self._post(channel_id, parts)
+        self._discard_if_empty(channel_id, buffer)
+
+    def _discard_if_empty(self, channel_id, buffer: _ChannelBuffer):
+        """Forget an idle channel: _buffers only holds channels with messages waiting"""
+        with self._lock:
+            with buffer.lock:
+                if not buffer.parts and buffer.timer is None and self._buffers.get(channel_id) is buffer:
+                    del self._buffers[channel_id]
+
+    def _post(self, channel_id, parts: List[Tuple[str, Future]]):
+        try:
+            result = self._http._post_message(channel_id, self.separator.join(content for content, _ in parts))
+        except Exception as e:
+            # Les appelants ignorent souvent le Future : l'échec doit au moins apparaître dans les logs
+            print(f"❌ Envoi groupé impossible dans {channel_id} ({len(parts)} message(s)) : {e}")
+            for _, future in parts:
+                future.set_exception(e)
+            return
+        self.sent += 1
+        for _, future in parts:
+            future.set_result(result)
+
+    def close(self):
+        """Send everything still waiting"""
+        self.flush()
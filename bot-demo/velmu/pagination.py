@@ -0,0 +1,122 @@
+"""
+Lazy cursor pagination over a channel's messages
+
+Messages come newest first, one page at a time, so scanning or purging thousands
+of messages only ever holds one page (two with prefetch) in memory. Stopping the
+loop early stops the requests.
+
+The cursor is the id of the last message of the previous page: deleting that
+message before the next page is fetched ends the iteration, so a purge should
+fit in one page (page_size=limit).
+
+Example:
+    for message in channel.history_iter(limit=None, page_size=100):
+        if message.created_at < cutoff:
+            break
+
+    async for message in channel.history_iter(limit=1000, prefetch=True):
+        ...
+"""
+
+import asyncio
+import contextvars
+from typing import Any, Callable, List, Optional
+
+
+class MessageIterator:
+    """
+    Sync and async iterator over `GET /messages?channelId=&cursor=` pages.
+
+    Args:
+        limit: maximum number of messages (None = the whole channel)
+        page_size: messages per request
+        prefetch: fetch the next page in the background while the current one is consumed
+    """
+
+    def __init__(self, http, channel_id: str, build: Callable[[dict], Any], limit: Optional[int] = 50,
+                 page_size: int = 50, prefetch: bool = False):
+        self._http = http
+        self.channel_id = channel_id
+        self._build = build
+        self.limit = limit
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.pages_fetched = 0
+
+    def _page_limit(self, yielded: int) -> int:
+        if self.limit is None:
+            return self.page_size
+        return min(self.page_size, self.limit - yielded)
+
+    def _fetch(self, cursor: Optional[str], size: int) -> List[dict]:
+        self.pages_fetched += 1
+        page = self._http.get_channel_messages(self.channel_id, limit=size, cursor=cursor)
+        return page if isinstance(page, list) else []
+
+    def _next_request(self, page: List[dict], size: int, yielded: int):
+        """(cursor, size) of the page after `page`, or None when the end is reached"""
+        if len(page) < size:
+            return None
+        size = self._page_limit(yielded + len(page))
+        return (page[-1].get('id'), size) if size > 0 else None
+
+    # --- Synchrone ---
+    def __iter__(self):
+        yielded = 0
+        request = (None, self._page_limit(0))
+        page = self._fetch(*request) if request[1] > 0 else []
+        pending = None
+        try:
+            while page:
+                request = self._next_request(page, request[1], yielded)
+                if request and self.prefetch:
+                    pending = self._http.submit(self._fetch, *request)
+                for data in page:
+                    yield self._build(data)
+                yielded += len(page)
+                if not request:
+                    break
+                if pending is not None:
+                    page, pending = pending.result(), None
+                else:
+                    page = self._fetch(*request)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    # --- Asynchrone ---
+    async def _fetch_async(self, cursor, size):
+        loop = asyncio.get_running_loop()
+        # Contexte copié : la requête reste dans la trace de l'événement en cours
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, context.run, self._fetch, cursor, size)
+
+    async def _aiter(self):
+        yielded = 0
+        request = (None, self._page_limit(0))
+        page = await self._fetch_async(*request) if request[1] > 0 else []
+        pending = None
+        try:
+            while page:
+                request = self._next_request(page, request[1], yielded)
+                if request and self.prefetch:
+                    pending = asyncio.ensure_future(self._fetch_async(*request))
+                for data in page:
+                    yield self._build(data)
+                yielded += len(page)
+                if not request:
+                    break
+                if pending is not None:
+                    page, pending = await pending, None
+                else:
+                    page = await self._fetch_async(*request)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def __aiter__(self):
+        return self._aiter()
+
+    def flatten(self) -> list:
+        """Every message in a list (for small limits)"""
+        return list(self)
@@ -0,0 +1,259 @@
+"""
+On-demand profiling of a running bot, without restarting it
+
+Three modes, each running for N seconds in a background thread and writing a file:
+    sample  -> stack sampling of every thread, collapsed stacks (flamegraph.pl / speedscope)
+    cpu     -> cProfile of the client event loop thread (async handlers) and of every
+               sync handler call on the Socket.IO threads, merged in one .prof (pstats/snakeviz);
+               on Python >= 3.12 the loop's cProfile already covers every thread
+    memory  -> tracemalloc snapshot diff between the start and the end of the window
+
+Example:
+    client.profile('memory', seconds=60)                 # from code
+    manager.enable_admin_commands(owner_ids=[...])       # !profile sample 30 from the chat
+    client.serve_profiler(9101)                          # curl '127.0.0.1:9101/profile?mode=cpu&seconds=30'
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+MODES = ('sample', 'cpu', 'memory')
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profiling session is already running"""
+
+
+class Profiler:
+    """
+    One profiling session at a time for a client.
+
+    Args:
+        output_dir: where profile files are written
+        interval: sampling period in seconds for the `sample` mode
+    """
+
+    def __init__(self, client=None, output_dir: str = 'profiles', interval: float = 0.005):
+        self.client = client
+        self.output_dir = output_dir
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._running: Optional[str] = None
+        # Mode cpu : profils des appels de handlers sync, un par appel (voir capture_start)
+        self._captures: Optional[list] = None
+        self._server = None
+
+    @property
+    def running(self) -> Optional[str]:
+        return self._running
+
+    def start(self, mode: str = 'sample', seconds: float = 30.0,
+              callback: Optional[Callable[[str, str], None]] = None) -> threading.Thread:
+        """
+        Start a session in the background; `callback(path, summary)` is called when
+        the file is written. Raises ProfilerBusyError if a session is running.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu : {mode} (attendus : {', '.join(MODES)})")
+        with self._lock:
+            if self._running:
+                raise ProfilerBusyError(f"Profilage '{self._running}' déjà en cours")
+            self._running = mode
+
+        thread = threading.Thread(target=self._run, args=(mode, seconds, callback),
+                                  name=f'velmu-profile-{mode}', daemon=True)
+        thread.start()
+        return thread
+
+    def run(self, mode: str = 'sample', seconds: float = 30.0) -> Tuple[str, str]:
+        """Blocking variant of start(); returns (path, summary)"""
+        result = []
+        self.start(mode, seconds, lambda path, summary: result.append((path, summary))).join()
+        if not result:
+            raise RuntimeError("Le profilage a échoué (voir les logs)")
+        return result[0]
+
+    def serve(self, port: int = 9101, host: str = '127.0.0.1'):
+        """
+        Local control socket: GET /profile?mode=cpu&seconds=30 runs a session and
+        answers with the file path and its summary (409 if one is already running).
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+
+        profiler = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                if url.path != '/profile':
+                    return self._reply(404, "GET /profile?mode=sample|cpu|memory&seconds=30\n")
+                try:
+                    path, summary = profiler.run(query.get('mode', 'sample'), float(query.get('seconds', 30)))
+                except ProfilerBusyError as e:
+                    return self._reply(409, f"{e}\n")
+                except (ValueError, RuntimeError) as e:
+                    return self._reply(400, f"{e}\n")
+                self._reply(200, f"{path}\n{summary}\n")
+
+            def _reply(self, status, text):
+                body = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='velmu-profiler', daemon=True).start()
+        print(f"🔬 Profilage à la demande : http://{host}:{self._server.server_port}/profile?mode=cpu&seconds=30")
+        return self._server
+
+    # --- Capture des handlers sync (mode cpu) ---
+    def capture_start(self):
+        """
+        Profile of the calling thread if a cpu session is running (None otherwise).
+
+        Python >= 3.12 builds cProfile on sys.monitoring, which allows a single active
+        profiler per process: enable() then raises ValueError while the loop thread's
+        profile runs. That profile already sees every thread there, so the handler is
+        simply not profiled a second time.
+        """
+        if self._captures is None:
+            return None
+        import cProfile
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        return profile
+
+    def capture_end(self, profile):
+        profile.disable()
+        captures = self._captures
+        if captures is not None:
+            captures.append(profile)
+
+    def _run(self, mode, seconds, callback):
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            path, summary = getattr(self, f'_profile_{mode}')(seconds, os.path.join(self.output_dir, f'{mode}-{stamp}'))
+            print(f"🔬 Profil {mode} écrit : {path}")
+            if callback:
+                callback(path, summary)
+        except Exception as e:
+            print(f"❌ Erreur de profilage ({mode}) : {e}")
+        finally:
+            self._running = None
+
+    # --- Modes ---
+    def _profile_sample(self, seconds: float, base: str) -> Tuple[str, str]:
+        own = threading.get_ident()
+        names = {}
+        stacks: Counter = Counter()
+        leaves: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _stack(frame)
+                if not stack:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stacks[(names.get(ident, str(ident)),) + stack] += 1
+                leaves[stack[-1]] += 1
+            time.sleep(self.interval)
+
+        path = base + '.collapsed.txt'
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+        total = sum(leaves.values()) or 1
+        summary = '\n'.join(f"{count * 100 / total:5.1f}%  {leaf}" for leaf, count in leaves.most_common(5))
+        return path, summary
+
+    def _profile_cpu(self, seconds: float, base: str) -> Tuple[str, str]:
+        if self.client is None:
+            raise RuntimeError("Le mode cpu profile la boucle du client : Profiler(client) requis")
+        import cProfile
+        import pstats
+
+        # cProfile ne suit que le thread qui l'active : on l'active sur la boucle du client
+        # (handlers async), et Client._dispatch profile chaque appel de handler sync dans
+        # son propre thread Socket.IO (capture_start / capture_end)
+        profile = cProfile.Profile()
+        self._captures = captures = []
+        self.client.run_coroutine(_call(profile.enable))
+        try:
+            time.sleep(seconds)
+        finally:
+            self._captures = None
+            self.client.run_coroutine(_call(profile.disable))
+
+        stats = pstats.Stats(profile)
+        for capture in list(captures):
+            stats.add(capture)
+        path = base + '.prof'
+        stats.dump_stats(path)
+        # Temps propre (hors appels) : l'attente de la boucle dans select() n'écrase pas le reste
+        top = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:5]
+        summary = '\n'.join(f"{tt * 1000:8.1f} ms  {os.path.basename(file)}:{func}:{line}"
+                            for (file, line, func), (_, _, tt, _, _) in top)
+        summary += f"\n({len(captures)} appel(s) de handlers sync profilé(s))"
+        return path, summary
+
+    def _profile_memory(self, seconds: float, base: str) -> Tuple[str, str]:
+        import tracemalloc
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(10)
+        try:
+            before = tracemalloc.take_snapshot()
+            time.sleep(seconds)
+            after = tracemalloc.take_snapshot()
+        finally:
+            if started:
+                tracemalloc.stop()
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        path = base + '.memory.txt'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Différence d'allocations sur {seconds:.0f}s (top 50)\n\n")
+            for stat in diff[:50]:
+                f.write(f"{stat}\n")
+        summary = '\n'.join(f"{stat.size_diff / 1024:+9.1f} KiB  {stat.traceback[0]}" for stat in diff[:5])
+        return path, summary
+
+
+async def _call(func):
+    func()
+
+
+def _stack(frame) -> Tuple[str, ...]:
+    stack: List[str] = []
+    while frame is not None:
+        stack.append(_code_label(frame.f_code))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def _code_label(code) -> str:
+    if isinstance(code, str):
+        return code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
@@ -0,0 +1,150 @@
+"""
+Gateway traffic recording and time-scaled replay
+
+A recording is a JSONL file (gzip-compressed when the path ends in `.gz`), one
+inbound Socket.IO event per line: {"t": seconds since start, "e": event, "d": payload}.
+The first line holds metadata ({"e": "__meta__", ...}) such as the bot user.
+
+Example:
+    client.record("burst.jsonl.gz")       # while the bot runs in production
+    ...
+    replayer = EventReplayer("burst.jsonl.gz")
+    replayer.replay(client, speed=None)   # as fast as possible, no server needed
+"""
+
+import gzip
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+META_EVENT = '__meta__'
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+class EventRecorder:
+    """
+    Appends every inbound event, with its timestamp, to a recording file.
+
+    Lines are flushed (a gzip sync point for `.gz`) every `flush_interval` seconds
+    by a background thread, so a crash loses at most that much even if the traffic
+    stops right after a burst; 0 flushes after every event instead.
+    """
+
+    def __init__(self, path: str, meta: Optional[Dict[str, Any]] = None, flush_interval: float = 1.0):
+        self.path = path
+        self.count = 0
+        self.flush_interval = flush_interval
+        self._file = _open(path, 'w')
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._file.write(_dumps({'t': 0, 'e': META_EVENT, 'd': {'recorded_at': time.time(), **(meta or {})}}) + '\n')
+        self._file.flush()
+        self._dirty = False
+        self._closed = threading.Event()
+        if flush_interval > 0:
+            threading.Thread(target=self._flush_periodically, name='velmu-recorder', daemon=True).start()
+
+    def record(self, event: str, data: Any):
+        line = _dumps({'t': round(time.monotonic() - self._start, 6), 'e': event, 'd': data})
+        with self._lock:
+            if self._file:
+                self._file.write(line + '\n')
+                self.count += 1
+                self._dirty = True
+                if self.flush_interval <= 0:
+                    self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._file and self._dirty:
+            self._file.flush()
+            self._dirty = False
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+def read_events(path: str) -> Iterator[Tuple[float, str, Any]]:
+    """
+    Yield (timestamp, event, payload) from a recording, metadata excluded. A
+    recording still being written, or cut short by a crash, is read up to its
+    last flushed line.
+    """
+    with _open(path, 'r') as f:
+        lines = iter(f)
+        while True:
+            try:
+                line = next(lines)
+            except (StopIteration, EOFError):  # EOFError : gzip sans fin de flux
+                return
+            if not line.strip() or not line.endswith('\n'):
+                continue
+            entry = json.loads(line)
+            if entry['e'] != META_EVENT:
+                yield entry['t'], entry['e'], entry['d']
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with _open(path, 'r') as f:
+        entry = json.loads(f.readline() or '{}')
+    return entry.get('d', {}) if entry.get('e') == META_EVENT else {}
+
+
+class EventReplayer:
+    """
+    Feeds a recording back into a Client, without any server.
+
+    Args:
+        speed: 1.0 replays in real time, 10.0 ten times faster, None as fast as possible
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta = read_meta(path)
+
+    def replay(self, client, speed: Optional[float] = 1.0) -> Dict[str, float]:
+        """Dispatch every recorded event in order; returns count and elapsed time"""
+        self._prepare(client)
+        count = 0
+        start = time.monotonic()
+        for timestamp, event, data in read_events(self.path):
+            if speed:
+                delay = timestamp / speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            client._receive(event, data)
+            count += 1
+        elapsed = time.monotonic() - start
+        return {'events': count, 'elapsed': elapsed, 'rate': count / elapsed if elapsed else 0.0}
+
+    def _prepare(self, client):
+        from .http import HTTPClient
+        from .models import User
+
+        if client.http is None:
+            # Pas de connexion : les handlers peuvent construire leurs objets, les appels REST
+            # iront vers client.base_url (par exemple un FakeVelmuServer)
+            client.http = HTTPClient('', api_url=f"{client.base_url}/api")
+        if client.user is None and self.meta.get('user'):
+            client.user = User(self.meta['user'], client.http)
@@ -0,0 +1,106 @@
+"""
+Several bots (tokens) in one process
+
+Each Client keeps its own token, handlers and Socket.IO connection, but they all
+share one event loop thread, one HTTP connection pool, one background thread pool
+and the channel -> server cache, instead of one of each per process.
+
+Example (see run_bots.py):
+    runner = BotRunner()
+    runner.add(main.client, main.BOT_TOKEN, setup=main.setup)
+    runner.add(gemini_bot.client, gemini_bot.BOT_TOKEN, shutdown=gemini_bot.shutdown)
+    runner.run()
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+
+class _Bot:
+    def __init__(self, client, token: str, setup: Optional[Callable] = None, shutdown: Optional[Callable] = None):
+        self.client = client
+        self.token = token
+        self.setup = setup
+        self.shutdown = shutdown
+        self.thread: Optional[threading.Thread] = None
+
+
+class BotRunner:
+    """
+    Hosts several Client instances on shared resources.
+
+    Args:
+        pool_size: keep-alive connections kept per host by the shared HTTP pool
+        background_workers: threads of the shared pool used for add_reactions, prefetch...
+    """
+
+    def __init__(self, pool_size: int = 32, background_workers: int = 8):
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, name='velmu-loop', daemon=True)
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=background_workers, thread_name_prefix='velmu-http')
+        self.channel_servers = {}
+
+        self.bots: List[_Bot] = []
+
+    def add(self, client, token: str, setup: Optional[Callable] = None, shutdown: Optional[Callable] = None):
+        """
+        Attach a client (before it is started). `setup()` runs just before it connects,
+        `shutdown()` when the runner stops.
+        """
+        if client.http is not None:
+            raise RuntimeError("Le client est déjà lancé : ajoutez-le au BotRunner avant run()")
+        client.loop.close()
+        client.loop = self.loop
+        client._loop_thread = self._loop_thread
+        client._session = self.session
+        client._executor = self.executor
+        client._channel_servers = self.channel_servers
+        self.bots.append(_Bot(client, token, setup, shutdown))
+        return client
+
+    def run(self):
+        """Connect every bot and block until they all stop (or Ctrl+C)"""
+        self.start()
+        try:
+            for bot in self.bots:
+                while bot.thread.is_alive():
+                    bot.thread.join(0.5)
+        except KeyboardInterrupt:
+            print("⏹️ Arrêt des bots…")
+        finally:
+            self.stop()
+
+    def start(self):
+        if not self._loop_thread.is_alive():
+            self._loop_thread.start()
+        for i, bot in enumerate(self.bots):
+            if bot.setup:
+                bot.setup()
+            bot.thread = threading.Thread(target=bot.client.run, args=(bot.token,), name=f'velmu-bot-{i}', daemon=True)
+            bot.thread.start()
+        print(f"🤖 {len(self.bots)} bot(s) lancés dans ce processus")
+
+    def stop(self):
+        for bot in self.bots:
+            bot.client.close()
+        for bot in self.bots:
+            if bot.thread:
+                bot.thread.join(timeout=5)
+            if bot.shutdown:
+                try:
+                    bot.shutdown()
+                except Exception as e:
+                    print(f"Erreur à l'arrêt d'un bot : {e}")
+        self.executor.shutdown(wait=False)
+        self.session.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
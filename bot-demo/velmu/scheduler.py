@@ -0,0 +1,115 @@
+"""
+Per-channel scheduling of expensive generations (LLM calls, renders, ...)
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class GenerationContext:
+    """What a single generation has to answer, handed to the generate callback"""
+    def __init__(self, scheduler: 'GenerationScheduler', channel_id: str, requests: List[Any]):
+        self.channel_id = channel_id
+        self.requests = requests
+        self._scheduler = scheduler
+        self._version = scheduler._channels[channel_id].version
+
+    @property
+    def latest(self) -> Any:
+        """The most recent request of the batch"""
+        return self.requests[-1]
+
+    @property
+    def superseded(self) -> bool:
+        """True once newer requests arrived for this channel after the generation started"""
+        state = self._scheduler._channels.get(self.channel_id)
+        return state is not None and state.version != self._version
+
+
+class _ChannelState:
+    __slots__ = ('pending', 'version', 'task')
+
+    def __init__(self):
+        self.pending: List[tuple] = []
+        self.version = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class GenerationScheduler:
+    """
+    Runs at most one generation per channel and at most `max_concurrent` overall.
+
+    Requests submitted while a channel is busy (or waiting for a global slot) are
+    coalesced: the next generation receives all of them at once instead of one
+    call per request. Requests older than `max_age` seconds when their generation
+    starts are dropped, and `GenerationContext.superseded` lets the callback give
+    up on a result that newer context has made obsolete.
+
+    Example:
+        async def generate(ctx):
+            reply = await llm(build_prompt(ctx.channel_id))
+            if not ctx.superseded:
+                ctx.latest.reply(reply)
+
+        scheduler = GenerationScheduler(generate, max_concurrent=2)
+        scheduler.submit(message.channel_id, message)
+    """
+
+    def __init__(self, generate: Callable[[GenerationContext], Awaitable[None]],
+                 max_concurrent: int = 2, max_age: Optional[float] = 60.0):
+        self.generate = generate
+        self.max_concurrent = max_concurrent
+        self.max_age = max_age
+        self._channels: Dict[str, _ChannelState] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.submitted = 0
+        self.generations = 0
+        self.dropped = 0
+
+    def submit(self, channel_id, request: Any):
+        """Queue a request for a channel. Must be called from the event loop; never blocks."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        key = str(channel_id)
+        state = self._channels.get(key)
+        if state is None:
+            state = self._channels[key] = _ChannelState()
+        state.pending.append((time.monotonic(), request))
+        state.version += 1
+        self.submitted += 1
+
+        if state.task is None:
+            state.task = asyncio.get_running_loop().create_task(self._drain(key, state))
+
+    def in_flight(self) -> int:
+        return sum(1 for state in self._channels.values() if state.task is not None)
+
+    async def _drain(self, key: str, state: _ChannelState):
+        try:
+            while state.pending:
+                async with self._semaphore:
+                    # Take the batch only once a slot is free: everything that arrived meanwhile is merged
+                    batch, state.pending = state.pending, []
+                    requests = self._fresh(batch)
+                    if not requests:
+                        continue
+                    self.generations += 1
+                    try:
+                        await self.generate(GenerationContext(self, key, requests))
+                    except Exception as e:
+                        print(f"Erreur lors de la génération ({key}) : {e}")
+        finally:
+            state.task = None
+            if not state.pending:
+                self._channels.pop(key, None)
+
+    def _fresh(self, batch: List[tuple]) -> List[Any]:
+        if self.max_age is None:
+            return [request for _, request in batch]
+        cutoff = time.monotonic() - self.max_age
+        fresh = [request for submitted_at, request in batch if submitted_at >= cutoff]
+        self.dropped += len(batch) - len(fresh)
+        return fresh
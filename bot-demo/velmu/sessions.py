@@ -0,0 +1,176 @@
+"""
+Expiring session store (games, prompts, pending confirmations...)
+
+Sessions are keyed by message id and expire after a per-session TTL. Expiry is
+driven by a hashed timer wheel: each session sits in the slot of its deadline,
+and a background thread only looks at the slots whose time has come, so adding,
+finding, renewing and removing a session are all O(1) whatever the store size.
+
+Example:
+    def expire(message_id, game):
+        client.http.edit_message(message_id, "⌛ Défi expiré")
+
+    games = SessionStore(ttl=300, on_expire=expire)
+    games[msg_id] = {'p1': ..., 'moves': {}}
+    game = games.get(reaction.message_id)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Set, Tuple
+
+_MISSING = object()
+
+
+class SessionStore:
+    """
+    Dict-like store whose entries expire after `ttl` seconds.
+
+    Args:
+        ttl: default lifetime of a session (renewed by set() / touch())
+        on_expire: optional callback(key, value), called from the wheel thread when a
+                   session times out (not when it is removed with pop / del)
+        tick: wheel resolution in seconds, i.e. how late an expiry may fire
+        slots: number of wheel slots; one revolution covers `slots * tick` seconds
+        max_sessions: optional hard cap; the oldest sessions are expired first
+    """
+
+    def __init__(self, ttl: float = 300.0, on_expire: Optional[Callable[[Hashable, Any], Any]] = None,
+                 tick: float = 1.0, slots: int = 512, max_sessions: Optional[int] = None):
+        self.ttl = ttl
+        self.on_expire = on_expire
+        self.tick = tick
+        self.max_sessions = max_sessions
+
+        # key -> [value, deadline, slot]; insertion order = age, for max_sessions
+        self._entries: 'OrderedDict[Hashable, list]' = OrderedDict()
+        self._wheel: List[Set[Hashable]] = [set() for _ in range(slots)]
+        self._lock = threading.Lock()
+        self._last_tick = self._tick_of(time.monotonic())
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.expired = 0
+
+    # --- Accès ---
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        deadline = time.monotonic() + (self.ttl if ttl is None else ttl)
+        evicted = []
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._wheel[entry[2]].discard(key)
+            # Case du premier tick entièrement après l'échéance, jamais une case déjà passée
+            slot = max(self._tick_of(deadline) + 1, self._last_tick + 1) % len(self._wheel)
+            self._entries[key] = [value, deadline, slot]
+            self._wheel[slot].add(key)
+            if self.max_sessions is not None:
+                while len(self._entries) > self.max_sessions:
+                    evicted.append(self._remove_oldest())
+        self._ensure_thread()
+        self._notify(evicted)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return default
+        return entry[0]
+
+    def touch(self, key: Hashable, ttl: Optional[float] = None) -> bool:
+        """Renew a session's lifetime; returns False if it no longer exists"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            return False
+        self.set(key, value, ttl)
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._wheel[entry[2]].discard(key)
+        return entry[0]
+
+    def ttl_left(self, key: Hashable) -> Optional[float]:
+        entry = self._entries.get(key)
+        return max(0.0, entry[1] - time.monotonic()) if entry else None
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __delitem__(self, key):
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries))
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    # --- Roue de temporisation ---
+    def _tick_of(self, timestamp: float) -> int:
+        return int(timestamp / self.tick)
+
+    def expire_due(self, now: Optional[float] = None) -> int:
+        """Expire every session whose deadline has passed; returns how many"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._lock:
+            current = self._tick_of(now)
+            # Au-delà d'un tour complet, chaque case n'a besoin d'être visitée qu'une fois
+            first = max(self._last_tick + 1, current - len(self._wheel) + 1)
+            for tick in range(first, current + 1):
+                bucket = self._wheel[tick % len(self._wheel)]
+                for key in [k for k in bucket if self._entries[k][1] <= now]:
+                    bucket.discard(key)
+                    expired.append((key, self._entries.pop(key)[0]))
+            self._last_tick = max(self._last_tick, current)
+        self._notify(expired)
+        return len(expired)
+
+    def _remove_oldest(self) -> Tuple[Hashable, Any]:
+        key, entry = self._entries.popitem(last=False)
+        self._wheel[entry[2]].discard(key)
+        return key, entry[0]
+
+    def _notify(self, expired: List[Tuple[Hashable, Any]]):
+        self.expired += len(expired)
+        if not self.on_expire:
+            return
+        for key, value in expired:
+            try:
+                self.on_expire(key, value)
+            except Exception as e:
+                print(f"Erreur dans on_expire ({key}) : {e}")
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='velmu-sessions', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            self.expire_due()
+
+    def close(self):
+        """Stop the wheel thread (pending sessions are kept, not expired)"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,240 @@
+"""
+One gateway process, N worker processes
+
+The gateway holds the single Socket.IO connection (reconnection, backfill and
+subscriptions included) and does no bot work: every gateway event is put on the
+queue of one worker, chosen by a consistent hash of its server id. Each worker
+imports the bot module, opens its own REST session and handles its queue in
+order, so the events of one server are always handled in order, by the same
+process (in-memory state such as pfc_bot's games stays consistent), while
+different servers run on different CPUs.
+
+Reactions carry no server id: the gateway remembers which server each message
+it forwarded belongs to, and falls back to hashing the message id.
+
+Subscriptions (Client.subscribe) are declared by the bot module, so they live in
+the workers: each worker reports its scopes on a control queue when it starts
+and whenever they change, and the gateway applies the latest report (rooms left
+or joined, out-of-scope messages dropped before hashing).
+
+Example (see run_bots.py --shards):
+    ShardedRunner('main:client', main.BOT_TOKEN, workers=4, setup='main:setup').run()
+
+Targets are "module:attribute" strings so the workers can import them (spawn).
+"""
+
+import bisect
+import hashlib
+import importlib
+import multiprocessing
+import os
+import queue as queue_module
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from .client import Client
+from .http import HTTPClient
+from .models import User
+
+
+def resolve(target: str):
+    """'package.module:attr.attr' -> object"""
+    module_name, _, path = target.partition(':')
+    obj = importlib.import_module(module_name)
+    for name in path.split('.') if path else ():
+        obj = getattr(obj, name)
+    return obj
+
+
+class HashRing:
+    """
+    Consistent hashing of keys onto `nodes` (virtual nodes smooth the distribution).
+    Adding a node only moves about 1/N of the keys.
+    """
+
+    def __init__(self, nodes, replicas: int = 64):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._nodes: List = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+    def add(self, node):
+        for i in range(self.replicas):
+            point = self._hash(f'{node}#{i}')
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._nodes.insert(index, node)
+
+    def node_for(self, key) -> object:
+        index = bisect.bisect(self._points, self._hash(str(key))) % len(self._points)
+        return self._nodes[index]
+
+
+class ShardGateway(Client):
+    """Client whose gateway events go to worker queues instead of handlers."""
+
+    def __init__(self, queues, base_url=None, message_cache: int = 10000):
+        super().__init__(base_url)
+        self._queues = queues
+        self._ring = HashRing(range(len(queues)))
+        self._message_servers = OrderedDict()
+        self._message_cache = message_cache
+        self._routed = self.metrics.counter(
+            'velmu_shard_events_total', "Événements transmis à chaque worker", ('shard',))
+        for event_name in self._gateway_handlers:
+            if event_name != 'new_message':
+                self._gateway_handlers[event_name] = self._make_router(event_name)
+
+    def _make_router(self, event_name):
+        return lambda data: self._route(event_name, data, self._shard_key(data))
+
+    def _shard_key(self, data):
+        if not isinstance(data, dict):
+            return ''
+        if data.get('serverId'):
+            return data['serverId']
+        message_id = (data.get('reaction') or data).get('messageId')
+        return self._message_servers.get(message_id) or message_id or data.get('channelId') or ''
+
+    def set_subscriptions(self, subscriptions):
+        """Apply the scopes reported by a worker ({'servers': ..., 'channels': ...})"""
+        self._scope_servers = set(subscriptions.get('servers', ()))
+        self._scope_channels = set(subscriptions.get('channels', ()))
+        self._apply_subscriptions()
+
+    def _route(self, event_name, data, key, backfilled=False):
+        shard = self._ring.node_for(key)
+        self._queues[shard].put((event_name, data, backfilled))
+        self._routed.inc(shard=shard)
+
+    def _on_message_received(self, data, backfilled=False):
+        # Dédoublonnage et point de reprise ici : le rattrapage se fait une seule fois, au gateway
+        if not self._accept_message(data, backfilled):
+            return
+        server_id = data.get('serverId')
+        if server_id and data.get('id'):
+            self._message_servers[data['id']] = server_id
+            if len(self._message_servers) > self._message_cache:
+                self._message_servers.popitem(last=False)
+        self._route('new_message', data, server_id or data.get('channelId') or '', backfilled)
+
+
+def _worker_main(index: int, target: str, token: str, base_url: Optional[str], setup: Optional[str],
+                 shutdown: Optional[str], queue, control):
+    client = resolve(target)
+    if base_url:
+        client.base_url = base_url
+    if setup:
+        resolve(setup)()
+
+    # Le worker n'a pas de socket : ses abonnements (module du bot, handlers) partent au gateway
+    def report_subscriptions():
+        control.put((index, client.subscriptions))
+    client._apply_subscriptions = report_subscriptions
+    report_subscriptions()
+
+    client.http = HTTPClient(token, api_url=f"{client.base_url}/api", metrics=client.metrics, tracer=client.tracer)
+    try:
+        client.user = User(client.http.get_me(), client.http)
+        print(f"🧩 Worker {index} prêt ({client.user}, pid {os.getpid()})")
+        client._dispatch('on_ready')
+        while True:
+            item = queue.get()
+            if item is None:
+                break
+            event_name, data, backfilled = item
+            if backfilled:
+                client._on_message_received(data, backfilled=True)
+            else:
+                client._receive(event_name, data)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if shutdown:
+            resolve(shutdown)()
+
+
+class ShardedRunner:
+    """
+    Runs one bot on a gateway process and `workers` worker processes.
+
+    Args:
+        target: "module:attribute" of the bot's Client (its handlers run in the workers)
+        token: bot token (the gateway and every worker authenticate with it)
+        workers: number of worker processes (default: one per CPU)
+        setup: "module:function" called in each worker before it starts
+        shutdown: "module:function" called in each worker when it stops
+        queue_size: events buffered per worker before the gateway blocks (0 = unbounded)
+        startup_timeout: seconds to wait for each worker to report its subscriptions
+    """
+
+    def __init__(self, target: str, token: str, workers: Optional[int] = None, setup: Optional[str] = None,
+                 shutdown: Optional[str] = None, base_url: Optional[str] = None, queue_size: int = 0,
+                 startup_timeout: float = 60.0):
+        self.target = target
+        self.token = token
+        self.workers = workers or os.cpu_count() or 1
+        self.setup = setup
+        self.shutdown = shutdown
+        self.base_url = base_url
+        self.queue_size = queue_size
+        self.startup_timeout = startup_timeout
+        self._context = multiprocessing.get_context('spawn')
+        self.queues = [self._context.Queue(queue_size) for _ in range(self.workers)]
+        self.control = self._context.Queue()
+        self.processes = []
+        self.gateway = ShardGateway(self.queues, base_url)
+
+    def start(self):
+        """Start the worker processes and take their subscriptions (before the gateway connects)"""
+        for i, queue in enumerate(self.queues):
+            process = self._context.Process(
+                target=_worker_main, name=f'velmu-shard-{i}',
+                args=(i, self.target, self.token, self.gateway.base_url, self.setup, self.shutdown, queue,
+                      self.control))
+            process.start()
+            self.processes.append(process)
+        for _ in self.processes:
+            try:
+                _, subscriptions = self.control.get(timeout=self.startup_timeout)
+            except queue_module.Empty:
+                raise RuntimeError(f"Un worker n'a pas démarré en {self.startup_timeout:.0f} s") from None
+            self.gateway.set_subscriptions(subscriptions)
+        threading.Thread(target=self._watch_subscriptions, name='velmu-shard-control', daemon=True).start()
+        print(f"🧩 {self.workers} worker(s) lancés")
+
+    def _watch_subscriptions(self):
+        """Subscriptions changed by a worker at runtime (the latest report wins)"""
+        while True:
+            item = self.control.get()
+            if item is None:
+                break
+            self.gateway.set_subscriptions(item[1])
+
+    def run(self, reconnect: bool = True):
+        """Start the workers, then run the gateway until it stops (or Ctrl+C)"""
+        self.start()
+        try:
+            self.gateway.run(self.token, reconnect=reconnect)
+        except KeyboardInterrupt:
+            print("⏹️ Arrêt du gateway…")
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 10.0):
+        """Close the gateway, let every worker drain its queue, then join them"""
+        self.gateway.close()
+        self.control.put(None)
+        for queue in self.queues:
+            queue.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
@@ -0,0 +1,147 @@
+"""
+Progressive (streamed) replies: post a placeholder, then edit it as text is generated
+"""
+
+import asyncio
+import contextvars
+import time
+from typing import Any, AsyncIterable, Iterable, List, Optional, Union
+
+MAX_MESSAGE_LENGTH = 2000
+
+
+class StreamingReply:
+    """
+    A message whose content grows while it is being generated.
+
+    The placeholder is sent on `start()`. Each `push()` appends text; the message
+    is edited at most once every `min_interval` seconds (edits are rate limited),
+    with a single edit in flight at a time. `finish()` always writes the full text:
+    what does not fit in `max_length` goes out as follow-up messages.
+
+    Example:
+        reply = StreamingReply(client.http, message.channel_id, reply_to_id=message.id)
+        await reply.start()
+        async for chunk in llm_stream:
+            await reply.push(chunk.text)
+        await reply.finish()
+    """
+
+    def __init__(self, http, channel_id, reply_to_id=None, placeholder: str = "…",
+                 min_interval: float = 1.0, max_length: int = MAX_MESSAGE_LENGTH):
+        self._http = http
+        self.channel_id = channel_id
+        self.reply_to_id = reply_to_id
+        self.placeholder = placeholder
+        self.min_interval = min_interval
+        self.max_length = max_length
+
+        self.message_id: Optional[str] = None
+        self.text = ""
+        self.edits = 0
+        self._shown = placeholder
+        self._last_edit = 0.0
+        self._edit_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Send the placeholder message"""
+        data = await self._call(self._http.send_message, self.channel_id, self.placeholder,
+                                None, self.reply_to_id)
+        if isinstance(data, dict):
+            self.message_id = data.get('id')
+        self._last_edit = time.monotonic()
+        return data
+
+    async def push(self, chunk: str):
+        """Append generated text, editing the message if the throttle allows it"""
+        if not chunk:
+            return
+        self.text += chunk
+        if self.message_id is None or self._edit_task is not None:
+            return
+        if time.monotonic() - self._last_edit >= self.min_interval:
+            self._edit_task = asyncio.get_running_loop().create_task(self._edit(self._render("▌")))
+
+    async def finish(self) -> str:
+        """Wait for any pending edit, then write the complete text"""
+        if self._edit_task is not None:
+            await self._edit_task
+        first, *rest = split_message(self.text.strip() or self.placeholder, self.max_length)
+        if self.message_id is None:
+            # The placeholder could not be sent: fall back to a normal message
+            await self._call(self._http.send_message, self.channel_id, first, None, self.reply_to_id)
+        elif first != self._shown:
+            await self._edit(first)
+        for part in rest:
+            await self._call(self._http.send_message, self.channel_id, part)
+        return self.text
+
+    def _render(self, cursor: str = "") -> str:
+        text = self.text.strip() or self.placeholder
+        if len(text) + len(cursor) > self.max_length:
+            return text[:self.max_length - 1] + "…"
+        return text + cursor
+
+    async def _edit(self, content: str):
+        try:
+            if content != self._shown:
+                await self._call(self._http.edit_message, self.message_id, content)
+                self._shown = content
+                self.edits += 1
+        except Exception as e:
+            print(f"Erreur lors de l'édition du message {self.message_id} : {e}")
+        finally:
+            self._last_edit = time.monotonic()
+            self._edit_task = None
+
+    async def _call(self, func, *args):
+        # HTTPClient is blocking: keep the event loop free while the request runs.
+        # run_in_executor does not carry contextvars: copy them so the request span
+        # stays in the trace of the event being handled (see velmu.tracing)
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, context.run, func, *args)
+
+
+async def stream_reply(http, channel_id, chunks: Union[AsyncIterable[Any], Iterable[Any]],
+                       reply_to_id=None, **kwargs) -> str:
+    """
+    Stream `chunks` (strings, or objects with a `.text` attribute such as LLM stream
+    chunks) into a single message. Returns the full generated text.
+    """
+    reply = StreamingReply(http, channel_id, reply_to_id=reply_to_id, **kwargs)
+    await reply.start()
+    try:
+        if hasattr(chunks, '__aiter__'):
+            async for chunk in chunks:
+                await reply.push(_chunk_text(chunk))
+        else:
+            for chunk in chunks:
+                await reply.push(_chunk_text(chunk))
+    finally:
+        await reply.finish()
+    return reply.text
+
+
+def split_message(text: str, max_length: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Cut `text` into messages of at most `max_length` characters, at a line break or space when possible"""
+    parts = []
+    while len(text) > max_length:
+        cut = text.rfind('\n', 0, max_length)
+        if cut < max_length // 2:
+            cut = text.rfind(' ', 0, max_length)
+        if cut < max_length // 2:
+            cut = max_length
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    parts.append(text)
+    return parts
+
+
+def _chunk_text(chunk: Any) -> str:
+    if isinstance(chunk, str):
+        return chunk
+    try:
+        return getattr(chunk, 'text', '') or ''
+    except ValueError:
+        # LLM SDK chunks (e.g. Gemini) raise ValueError on `.text` for a blocked or empty candidate: skip it
+        return ''
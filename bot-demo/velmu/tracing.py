@@ -0,0 +1,190 @@
+"""
+Request and event tracing
+
+Every inbound gateway event opens a root span; the user handlers, the commands
+they run and every REST call made on their behalf become child spans of the same
+trace, so a `new_message` can be followed down to each HTTP request it caused.
+The current span travels in a contextvar, which follows the handler onto the
+client loop and into the tasks it creates.
+
+Example:
+    client.tracer.add_exporter(FileSpanExporter("spans.jsonl"))
+
+    @client.tracer.hook
+    def on_request_end(span):
+        if span.duration > 0.5:
+            print(f"REST lente : {span.name} ({span.duration:.2f}s)")
+
+    # python benchmarks/trace_report.py spans.jsonl   -> REST fan-out and time per command
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+HOOKS = ('on_request_start', 'on_request_end', 'on_event_received', 'on_handler_done')
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('velmu_span', default=None)
+
+
+def current_span() -> Optional['Span']:
+    """Span of the event / handler / command being processed, if tracing is on"""
+    return _current_span.get()
+
+
+class Span:
+    __slots__ = ('name', 'kind', 'trace_id', 'span_id', 'parent_id', 'attributes',
+                 'start_time', 'duration', 'error', '_start', '_token')
+
+    def __init__(self, name: str, kind: str, parent: Optional['Span'] = None, **attributes):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = attributes
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start_time,
+            'duration': self.duration,
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+    def __repr__(self) -> str:
+        return f"<Span {self.kind}:{self.name} trace={self.trace_id[:8]} duration={self.duration}>"
+
+
+class Tracer:
+    """
+    Creates spans and calls the registered hooks and exporters.
+    Disabled (and free) until a hook or an exporter is registered.
+    """
+
+    def __init__(self):
+        self._hooks: Dict[str, List[Callable[[Span], Any]]] = {name: [] for name in HOOKS}
+        self._exporters: List[Any] = []
+        self.enabled = False
+
+    def hook(self, func: Callable[[Span], Any]) -> Callable[[Span], Any]:
+        """Décorateur : enregistre un hook d'après son nom (on_request_start, on_request_end...)"""
+        return self.add_hook(func.__name__, func)
+
+    def add_hook(self, name: str, func: Callable[[Span], Any]) -> Callable[[Span], Any]:
+        if name not in self._hooks:
+            raise ValueError(f"Hook inconnu : {name} (attendus : {', '.join(HOOKS)})")
+        self._hooks[name].append(func)
+        self.enabled = True
+        return func
+
+    def add_exporter(self, exporter):
+        """`exporter.export(span)` est appelé pour chaque span terminé"""
+        self._exporters.append(exporter)
+        self.enabled = True
+        return exporter
+
+    def start_span(self, name: str, kind: str, hook: Optional[str] = None, root: bool = False, **attributes) -> Span:
+        """Open a span as child of the current one (or a new trace) and make it current"""
+        span = Span(name, kind, None if root else _current_span.get(), **attributes)
+        span._token = _current_span.set(span)
+        if hook:
+            self._call(hook, span)
+        return span
+
+    def end_span(self, span: Span, hook: Optional[str] = None, error: Optional[BaseException] = None):
+        span.duration = time.perf_counter() - span._start
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        try:
+            _current_span.reset(span._token)
+        except ValueError:
+            # Fermé depuis un autre contexte (tâche détachée) : rien à restaurer
+            pass
+        if hook:
+            self._call(hook, span)
+        for exporter in self._exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                print(f"⚠️ Export de span impossible : {e}")
+
+    def _call(self, hook: str, span: Span):
+        for func in self._hooks[hook]:
+            try:
+                func(span)
+            except Exception as e:
+                print(f"⚠️ Erreur dans le hook {hook} : {e}")
+
+    def shutdown(self):
+        for exporter in self._exporters:
+            close = getattr(exporter, 'close', None)
+            if close:
+                close()
+
+
+class FileSpanExporter:
+    """Appends finished spans to a JSONL file, one span per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), separators=(',', ':'), ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file:
+                self._file.write(line + '\n')
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+def read_spans(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def fanout_report(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    Per command (or per event when no command ran): number of traces, REST calls
+    per trace and total time spent in REST vs. in the whole event.
+    """
+    by_trace = defaultdict(list)
+    for span in spans:
+        by_trace[span['trace_id']].append(span)
+
+    report = defaultdict(lambda: {'traces': 0, 'requests': 0, 'request_time': 0.0, 'event_time': 0.0})
+    for trace in by_trace.values():
+        commands = [s for s in trace if s['kind'] == 'command']
+        roots = [s for s in trace if s['parent_id'] is None]
+        key = f"!{commands[0]['name']}" if commands else (roots[0]['name'] if roots else '?')
+        requests_ = [s for s in trace if s['kind'] == 'request']
+        entry = report[key]
+        entry['traces'] += 1
+        entry['requests'] += len(requests_)
+        entry['request_time'] += sum(s['duration'] or 0 for s in requests_)
+        entry['event_time'] += sum(s['duration'] or 0 for s in roots)
+    return dict(report)